@@ -1,24 +1,30 @@
 #app.py
 import streamlit as st
 import os
-import tempfile
 import base64
 import json
-from mistral_client import MistralClient
-from ppt_generator import PPTGenerator
+import hashlib
+from artifact_store import ArtifactStore
+from audio_pipeline import AudioPipeline
+from document_extractor import apply_budget, combine_documents, extract_all
+from job_queue import JobQueue
+import metrics
+from pipeline import prepare_generation, run_generation, STAGE_LABELS, THEMES
+from render_cache import RenderCache
+from speculation import Speculator
+from thumbnails import ThumbnailRenderer
 import openai
 from dotenv import load_dotenv
-import io
-import docx2txt
-import PyPDF2
-import pandas as pd
 from audio_recorder_streamlit import audio_recorder
 import time
+import uuid
 import speech_recognition as sr
 
 # Load environment variables
 load_dotenv()
 
+COVER_IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images", "cover.jpeg")
+
 # Set OpenAI API key and initialize client
 openai_api_key = os.getenv("OPENAI_API_KEY")
 if openai_api_key:
@@ -39,35 +45,55 @@ if 'download_ready' not in st.session_state:
     st.session_state.download_ready = False
 if 'temp_file_path' not in st.session_state:
     st.session_state.temp_file_path = None
+if 'download_name' not in st.session_state:
+    st.session_state.download_name = None
 if 'speech_text' not in st.session_state:
     st.session_state.speech_text = ""
 if 'file_text' not in st.session_state:
     st.session_state.file_text = ""
 if 'is_recording' not in st.session_state:
     st.session_state.is_recording = False
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# One job queue per server process, shared by all sessions so jobs survive reruns
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(max_workers=int(os.getenv("QUICKSLIDE_MAX_WORKERS", "2")))
+
+# Shared speech pipeline; the backend is chosen with QUICKSLIDE_SPEECH_BACKEND
+@st.cache_resource
+def get_audio_pipeline():
+    return AudioPipeline()
+
+# Generated decks and extracted documents live in a size-capped store instead of loose temp files
+@st.cache_resource
+def get_artifact_store():
+    return ArtifactStore()
+
+# Rendered decks are served from memory or disk for repeated content and theme
+@st.cache_resource
+def get_render_cache():
+    return RenderCache(get_artifact_store())
     
-# Function to transcribe speech using OpenAI Whisper - Updated for OpenAI >= 1.0.0
+# Prepares the model request and cover image in the background while the user edits the inputs
+@st.cache_resource
+def get_speculator():
+    return Speculator()
+
+# Slide previews drawn with Pillow; cached per slide so regenerated decks only redraw what changed
+@st.cache_resource
+def get_thumbnail_renderer():
+    return ThumbnailRenderer()
+
+# Function to transcribe speech: resample, trim and chunk in memory, then transcribe chunks concurrently
 def transcribe_audio(audio_bytes):
     try:
-        # Create a recognizer instance
-        recognizer = sr.Recognizer()
-        
-        # Save audio bytes to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_file_path = tmp_file.name
-        
-        # Load the audio file and transcribe it
-        with sr.AudioFile(tmp_file_path) as source:
-            audio_data = recognizer.record(source)
-            
-            # Use Google's free speech recognition
-            # You can also try other engines like recognizer.recognize_sphinx() which is offline
-            text = recognizer.recognize_google(audio_data)
-            
-        # Clean up the temporary file
-        os.unlink(tmp_file_path)
-        
+        text = get_audio_pipeline().transcribe(audio_bytes)
+        if not text:
+            raise sr.UnknownValueError()
         return text
         
     except sr.UnknownValueError:
@@ -78,76 +104,14 @@ def transcribe_audio(audio_bytes):
         st.error(f"Error transcribing audio: {str(e)}")
         return f"Error: {str(e)}"
 
-# Function to extract text from uploaded files with improved error handling
-def extract_text_from_file(uploaded_file):
-    text = ""
-    file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-    
-    try:
-        # Handle different file types
-        if file_extension == '.txt':
-            text = uploaded_file.getvalue().decode('utf-8')
-        
-        elif file_extension == '.docx':
-            try:
-                text = docx2txt.process(io.BytesIO(uploaded_file.getvalue()))
-            except Exception as e:
-                return f"Error processing DOCX file: {str(e)}. Make sure it's a valid Word document."
-        
-        elif file_extension == '.pdf':
-            try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.getvalue()))
-                for page_num in range(len(pdf_reader.pages)):
-                    text += pdf_reader.pages[page_num].extract_text() + "\n"
-                
-                # Check if we got any text
-                if not text.strip():
-                    return "The PDF appears to contain scanned images rather than text. Cannot extract content."
-            except Exception as e:
-                return f"Error processing PDF file: {str(e)}. Make sure it's a valid PDF document."
-        
-        elif file_extension in ['.csv', '.xlsx', '.xls']:
-            try:
-                if file_extension == '.csv':
-                    df = pd.read_csv(uploaded_file)
-                else:
-                    df = pd.read_excel(uploaded_file)
-                
-                # Check if dataframe is empty
-                if df.empty:
-                    return "The uploaded file appears to be empty."
-                
-                # Convert the dataframe to a text summary
-                text = f"File summary: {uploaded_file.name}\n\n"
-                text += f"Columns: {', '.join(df.columns.tolist())}\n"
-                text += f"Rows: {len(df)}\n\n"
-                text += "Sample data (first 5 rows):\n"
-                text += df.head().to_string() + "\n\n"
-                text += "Statistical summary:\n"
-                
-                # Add basic statistics for numerical columns
-                numeric_cols = df.select_dtypes(include=['number']).columns
-                if len(numeric_cols) > 0:
-                    text += df[numeric_cols].describe().to_string()
-            except Exception as e:
-                return f"Error processing spreadsheet: {str(e)}. Make sure it's a valid file."
-        
-        else:
-            text = f"Unsupported file type: {file_extension}. Please upload a .txt, .docx, .pdf, .csv, or .xlsx file."
-    
-    except Exception as e:
-        text = f"Error processing file: {str(e)}"
-    
-    # Truncate very large files to prevent issues
-    if len(text) > 10000:
-        text = text[:10000] + "\n\n... (content truncated for length)"
-    
-    return text
-
 # Function to download the generated presentation
 def get_download_link(file_path, file_name):
-    with open(file_path, "rb") as file:
-        contents = file.read()
+    try:
+        with open(file_path, "rb") as file:
+            contents = file.read()
+    except FileNotFoundError:
+        # The deck was evicted from the artifact store
+        return None
     b64 = base64.b64encode(contents).decode()
     href = f'<a href="data:application/vnd.openxmlformats-officedocument.presentationml.presentation;base64,{b64}" download="{file_name}" class="download-button">Download Presentation</a>'
     return href
@@ -246,6 +210,7 @@ with st.container():
                 st.session_state.speech_text = ""
                 st.session_state.audio_bytes = None
                 st.session_state.cleared_audio = True
+                get_speculator().invalidate(st.session_state.session_id)
                 st.rerun()
             
             # Display audio player and transcribe button only if we have audio
@@ -279,36 +244,76 @@ with st.container():
         
         # File upload tab
         with input_tabs[1]:
-            st.markdown("##### 📄 Add Reference Document")
+            st.markdown("##### 📄 Add Reference Documents")
             
-            uploaded_file = st.file_uploader(
-                "Upload a document to enhance your presentation",
+            uploaded_files = st.file_uploader(
+                "Upload documents to enhance your presentation",
                 type=["txt", "pdf", "docx", "csv", "xlsx", "xls"],
+                accept_multiple_files=True,
                 help="Upload research papers, reports, or data to incorporate into your presentation."
             )
             
-            if uploaded_file is not None:
-                # Process file with progress indicator
-                with st.spinner(f"Processing {uploaded_file.name}..."):
-                    extracted_text = extract_text_from_file(uploaded_file)
+            if uploaded_files:
+                # Process files with progress indicator
+                with st.spinner(f"Processing {len(uploaded_files)} file(s)..."):
+                    # Reuse the extracted text of files that were processed before; extract the rest concurrently
+                    results = [None] * len(uploaded_files)
+                    extract_keys = []
+                    missing = []
+                    for index, uploaded_file in enumerate(uploaded_files):
+                        extract_key = ArtifactStore.make_key(
+                            "extract", 2, uploaded_file.name, hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+                        )
+                        extract_keys.append(extract_key)
+                        cached_text = get_artifact_store().read(extract_key, suffix=".txt")
+                        if cached_text is not None:
+                            text = cached_text.decode("utf-8")
+                            results[index] = {"name": uploaded_file.name, "status": "ok", "text": text,
+                                              "chars": len(text), "seconds": 0.0, "error": None, "cached": True}
+                        else:
+                            missing.append(index)
+                    
+                    if missing:
+                        with metrics.span("extract_files"):
+                            extracted = extract_all([uploaded_files[index] for index in missing])
+                        for index, result in zip(missing, extracted):
+                            results[index] = dict(result, cached=False)
+                            if result["status"] == "ok":
+                                get_artifact_store().put(extract_keys[index], result["text"].encode("utf-8"), suffix=".txt")
+                    
+                    # All documents share one reference budget, split fairly between them
+                    apply_budget(results)
+                    st.session_state.file_text = combine_documents(results)
+                    
+                    # Per-file status
+                    failed = [result for result in results if result["status"] != "ok"]
+                    for result in failed:
+                        st.error(f"{result['name']}: {result['error']}")
+                    if len(failed) < len(results):
+                        st.success(f"{len(results) - len(failed)} of {len(results)} file(s) successfully processed")
+                    st.dataframe([
+                        {
+                            "File": result["name"],
+                            "Size (KB)": round(len(uploaded_file.getvalue()) / 1024, 1),
+                            "Status": "cached" if result["cached"] else result["status"],
+                            "Characters": result["chars"],
+                            "Used": len(result["text"]) if result["status"] == "ok" else 0,
+                            "Time (s)": round(result["seconds"], 2),
+                        }
+                        for uploaded_file, result in zip(uploaded_files, results)
+                    ], hide_index=True, use_container_width=True)
                     
-                    # Check if we got an error message
-                    if extracted_text.startswith("Error"):
-                        st.error(extracted_text)
-                    else:
-                        st.session_state.file_text = extracted_text
-                        
-                        # Show success with file details
-                        file_size = len(uploaded_file.getvalue()) / 1024  # Size in KB
-                        st.success(f"File '{uploaded_file.name}' ({file_size:.1f} KB) successfully processed")
-                        
-                        # Show preview with expandable section
+                    # Show preview with expandable section
+                    if st.session_state.file_text:
                         with st.expander("View extracted content", expanded=False):
+                            extracted_text = st.session_state.file_text
                             if len(extracted_text) > 1000:
                                 preview = extracted_text[:1000] + "... (content truncated for preview)"
                                 st.text_area("File content preview", preview, height=200)
                             else:
                                 st.text_area("File content", extracted_text, height=200)
+            else:
+                st.session_state.file_text = ""
     
     with col2:
         # Presentation options
@@ -319,7 +324,7 @@ with st.container():
         
         theme = st.selectbox(
             "Select presentation theme:",
-            ["modern_blue", "elegant_dark", "vibrant", "minimal"],
+            THEMES,
             index=0,
             help="Visual style for your presentation"
         )
@@ -329,72 +334,101 @@ with st.container():
         num_slides = st.slider("Approximate slide count:", 10, 25, 15,
                             help="Target number of slides (actual may vary based on content)")
         
+        use_cover_image = st.checkbox("Add cover image", value=False,
+                            help="Places the cover image on the title slide and as a logo on section and closing slides")
+        
+        # Identical inputs reattach to the existing job instead of starting a new one
+        job_key = hashlib.sha256(json.dumps([
+            prompt.strip(), st.session_state.speech_text, st.session_state.file_text,
+            num_slides, detailed, theme, use_cover_image
+        ]).encode("utf-8")).hexdigest()
+        cover_image = COVER_IMAGE_PATH if use_cover_image else None
+
+        # Start preparing as soon as the inputs land; new inputs cancel the previous preparation
+        if prompt.strip():
+            get_speculator().submit(
+                st.session_state.session_id,
+                job_key,
+                prepare_generation,
+                prompt,
+                speech_text=st.session_state.speech_text,
+                file_text=st.session_state.file_text,
+                num_slides=num_slides,
+                detailed=detailed,
+                theme=theme,
+                image=cover_image
+            )
+
         # Generate button
         if st.button("Generate Presentation", type="primary"):
             # Check if text prompt is provided
             if not prompt.strip():
                 st.error("Please provide a presentation topic or description.")
             else:
-                # Build the prompt combining all inputs
-                full_prompt = prompt.strip()
-                
-                # Combine with voice input if available
-                if st.session_state.speech_text:
-                    full_prompt = f"{full_prompt}\n\nAdditional spoken details: {st.session_state.speech_text}"
-                
-                # Incorporate file content if available
-                if st.session_state.file_text:
-                    full_prompt = f"{full_prompt}\n\nReference material: {st.session_state.file_text}"
-                
-                # Add slide count preference
-                full_prompt = f"{full_prompt}\n\nTarget exactly {num_slides} slides total."
-                
-                # Generate the presentation
-                with st.spinner("Creating your presentation..."):
-                    try:
-                        # Initialize Mistral client
-                        client = MistralClient()
-                        
-                        # Generate content
-                        st.session_state.ppt_content = client.generate_content(full_prompt, detailed)
-                        
-                        if "error" in st.session_state.ppt_content:
-                            st.error(f"Error: {st.session_state.ppt_content['error']}")
-                        else:
-                            # Generate PPT with selected theme
-                            ppt_gen = PPTGenerator(theme=theme)
-                            ppt, actual_slide_count = ppt_gen.generate_from_content(st.session_state.ppt_content)
-                            
-                            # Save to temporary file
-                            temp_dir = tempfile.mkdtemp()
-                            # Use a safe version of the prompt for the filename
-                            safe_name = ''.join(c if c.isalnum() else '_' for c in prompt[:20]).strip('_')
-                            if not safe_name:
-                                safe_name = "ai_presentation"
-                            file_name = f"presentation_{safe_name}.pptx"
-                            file_path = os.path.join(temp_dir, file_name)
-                            ppt_gen.save(file_path)
-                            
-                            st.session_state.temp_file_path = file_path
-                            st.session_state.download_ready = True
-                            st.session_state.actual_slide_count = actual_slide_count
-                            
-                            # Show presentation ready message with actual slide count
-                            target_count = num_slides
-                            if actual_slide_count == target_count:
-                                st.success(f"✅ Your presentation with {actual_slide_count} slides is ready to download!")
-                            else:
-                                st.warning(f"✅ Your presentation is ready to download! Note: You requested {target_count} slides, but {actual_slide_count} slides were created to best fit the content.")
-                    except Exception as e:
-                        st.error(f"An error occurred: {str(e)}")
-                        st.error("If this is an API error, please check that your Mistral API key is configured correctly in the .env file.")
+                st.session_state.job_id = get_job_queue().submit(
+                    run_generation,
+                    prompt,
+                    get_render_cache(),
+                    speech_text=st.session_state.speech_text,
+                    file_text=st.session_state.file_text,
+                    num_slides=num_slides,
+                    detailed=detailed,
+                    theme=theme,
+                    image=cover_image,
+                    prepared=get_speculator().take(st.session_state.session_id, job_key),
+                    key=job_key
+                )
+                st.session_state.download_ready = False
+                st.session_state.preview_style = {"theme": theme, "image": cover_image}
+
+        # Show progress of the current generation job, if any
+        if st.session_state.job_id:
+            job = get_job_queue().get(st.session_state.job_id)
+            if job is None:
+                st.session_state.job_id = None
+            elif job["status"] not in ("done", "failed"):
+                st.progress(job["progress"], text=STAGE_LABELS.get(job["stage"], job["stage"]))
+                time.sleep(0.5)
+                st.rerun()
+            elif job["status"] == "failed":
+                st.error(f"An error occurred: {job['error']}")
+                st.error("If this is an API error, please check that your Mistral API key is configured correctly in the .env file.")
+            else:
+                result = job["result"]
+                actual_slide_count = result["slide_count"]
+                st.session_state.ppt_content = result["content"]
+                st.session_state.temp_file_path = result["file_path"]
+                st.session_state.download_name = result["file_name"]
+                st.session_state.download_ready = True
+                st.session_state.actual_slide_count = actual_slide_count
+
+                # Show presentation ready message with actual slide count
+                target_count = result["target_slides"]
+                if actual_slide_count == target_count:
+                    st.success(f"✅ Your presentation with {actual_slide_count} slides is ready to download!")
+                else:
+                    st.warning(f"✅ Your presentation is ready to download! Note: You requested {target_count} slides, but {actual_slide_count} slides were created to best fit the content.")
 
 # Display only the download link when ready
 if st.session_state.download_ready and st.session_state.temp_file_path:
     # Display download button
-    st.markdown(get_download_link(st.session_state.temp_file_path, 
-                                  os.path.basename(st.session_state.temp_file_path)), 
-                unsafe_allow_html=True)
+    download_link = get_download_link(st.session_state.temp_file_path,
+                                      st.session_state.download_name or os.path.basename(st.session_state.temp_file_path))
+    if download_link:
+        st.markdown(download_link, unsafe_allow_html=True)
+
+        # Preview grid of the generated slides
+        if st.session_state.ppt_content and st.session_state.get('preview_style'):
+            st.markdown("### Preview")
+            thumbnails = get_thumbnail_renderer().render_content(
+                st.session_state.ppt_content, **st.session_state.preview_style
+            )
+            columns = st.columns(4)
+            for index, thumbnail in enumerate(thumbnails):
+                columns[index % 4].image(thumbnail, caption=f"Slide {index + 1}", use_container_width=True)
+    else:
+        st.session_state.download_ready = False
+        st.info("This presentation has expired. Please generate it again.")
 
 # Add some information at the bottom
 st.markdown("---")
@@ -0,0 +1,232 @@
+#artifact_store.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_ROOT = os.path.join(tempfile.gettempdir(), "quickslide_artifacts")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # 1 day
+
+
+class ArtifactStore:
+    def __init__(self, root=None, max_bytes=None, ttl_seconds=None):
+        """
+        Content-addressed store for generated decks and intermediate files.
+
+        Files are written atomically, the total size is capped and the least recently
+        used files are evicted first. Files older than the TTL are evicted on access.
+
+        Args:
+            root (str, optional): Directory holding the artifacts. Defaults to
+                QUICKSLIDE_ARTIFACT_DIR or a folder in the system temp directory.
+            max_bytes (int, optional): Total size cap. Defaults to QUICKSLIDE_ARTIFACT_MAX_MB.
+            ttl_seconds (int, optional): Maximum age since last access. Defaults to
+                QUICKSLIDE_ARTIFACT_TTL; 0 disables expiry.
+        """
+        self.root = root or os.getenv("QUICKSLIDE_ARTIFACT_DIR") or DEFAULT_ROOT
+        if max_bytes is None:
+            max_mb = os.getenv("QUICKSLIDE_ARTIFACT_MAX_MB")
+            max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        if ttl_seconds is None:
+            ttl = os.getenv("QUICKSLIDE_ARTIFACT_TTL")
+            ttl_seconds = int(ttl) if ttl else DEFAULT_TTL_SECONDS
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # file name -> {"size", "last_access"}, ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._metrics = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Build a content address from any JSON-serializable values.
+
+        Args:
+            *parts: Values that together identify the artifact, e.g. deck content and theme
+
+        Returns:
+            str: A SHA-256 hex digest
+        """
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def path_for(self, key, suffix=".pptx"):
+        return os.path.join(self.root, key + suffix)
+
+    def get(self, key, suffix=".pptx"):
+        """
+        Look up an artifact.
+
+        Args:
+            key (str): Content address from `make_key`
+            suffix (str): File extension of the artifact
+
+        Returns:
+            dict or None: path and meta of the artifact, or None if it is not stored
+        """
+        name = key + suffix
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and self._is_expired(entry, time.time()):
+                self._remove(name)
+                self._metrics["expired"] += 1
+                entry = None
+            if entry is None or not os.path.exists(os.path.join(self.root, name)):
+                if entry is not None:
+                    self._remove(name)
+                self._metrics["misses"] += 1
+                return None
+
+            self._touch(name)
+            self._metrics["hits"] += 1
+            return {"path": os.path.join(self.root, name), "meta": self._read_meta(name)}
+
+    def read(self, key, suffix=".pptx"):
+        """Return the artifact bytes, or None if it is not stored"""
+        found = self.get(key, suffix)
+        if found is None:
+            return None
+        try:
+            with open(found["path"], "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, data, suffix=".pptx", meta=None):
+        """
+        Atomically write an artifact and evict old ones if the store is over its cap.
+
+        Args:
+            key (str): Content address from `make_key`
+            data (bytes): Artifact contents
+            suffix (str): File extension of the artifact
+            meta (dict, optional): Small JSON-serializable metadata kept next to the artifact
+
+        Returns:
+            str: Path of the stored artifact
+        """
+        name = key + suffix
+        path = os.path.join(self.root, name)
+        self._atomic_write(path, data)
+        size = len(data)
+        if meta is not None:
+            meta_bytes = json.dumps(meta).encode("utf-8")
+            self._atomic_write(path + ".meta", meta_bytes)
+            size += len(meta_bytes)
+
+        with self._lock:
+            if name in self._entries:
+                self._total_bytes -= self._entries[name]["size"]
+            self._entries[name] = {"size": size, "last_access": time.time()}
+            self._entries.move_to_end(name)
+            self._total_bytes += size
+            self._metrics["writes"] += 1
+            self._evict(keep=name)
+        return path
+
+    def metrics(self):
+        """Return hit, miss, write and eviction counters plus the current size of the store"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["artifacts"] = len(self._entries)
+            metrics["bytes"] = self._total_bytes
+            metrics["max_bytes"] = self.max_bytes
+            return metrics
+
+    def _atomic_write(self, path, data):
+        # Write to a temp file in the same directory, then rename over the target
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _load_index(self):
+        # Rebuild the LRU order from files left by a previous process, oldest first
+        found = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".tmp-"):
+                # Leftover from an interrupted write; skip recent ones that may still be in progress
+                try:
+                    if time.time() - os.path.getmtime(path) > 3600:
+                        os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            if name.endswith(".meta"):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            size = stat.st_size
+            if os.path.exists(path + ".meta"):
+                size += os.path.getsize(path + ".meta")
+            found.append((stat.st_mtime, name, size))
+
+        for mtime, name, size in sorted(found):
+            self._entries[name] = {"size": size, "last_access": mtime}
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+    def _read_meta(self, name):
+        try:
+            with open(os.path.join(self.root, name + ".meta"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_expired(self, entry, now):
+        return self.ttl_seconds > 0 and now - entry["last_access"] > self.ttl_seconds
+
+    def _touch(self, name):
+        # Record the access in memory and on disk so the LRU order survives restarts
+        now = time.time()
+        self._entries[name]["last_access"] = now
+        self._entries.move_to_end(name)
+        try:
+            os.utime(os.path.join(self.root, name), (now, now))
+        except OSError:
+            pass
+
+    def _remove(self, name):
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._total_bytes -= entry["size"]
+        for path in (os.path.join(self.root, name), os.path.join(self.root, name + ".meta")):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _evict(self, keep=None):
+        # Expire old entries, then drop least recently used ones until under the cap; must hold the lock
+        now = time.time()
+        for name in [n for n, e in self._entries.items() if n != keep and self._is_expired(e, now)]:
+            self._remove(name)
+            self._metrics["expired"] += 1
+
+        for name in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self._remove(name)
+            self._metrics["evictions"] += 1
@@ -0,0 +1,265 @@
+#audio_pipeline.py
+import argparse
+import io
+import os
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+def load_wav(audio_bytes):
+    """
+    Decode WAV bytes into mono float samples.
+
+    Args:
+        audio_bytes (bytes): A PCM WAV file
+
+    Returns:
+        tuple: (samples as a float32 array in [-1, 1], sample rate)
+    """
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width * 8} bits")
+
+    # Mix down to mono
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, sample_rate
+
+
+def resample(samples, sample_rate, target_rate=TARGET_SAMPLE_RATE):
+    """Resample to the target rate, smoothing first when downsampling to limit aliasing"""
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+
+    if sample_rate > target_rate:
+        width = int(round(sample_rate / target_rate))
+        if width > 1:
+            samples = np.convolve(samples, np.ones(width, dtype=np.float32) / width, mode="same")
+
+    duration = len(samples) / sample_rate
+    target_length = int(duration * target_rate)
+    source_times = np.arange(len(samples)) / sample_rate
+    target_times = np.arange(target_length) / target_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+def frame_levels(samples, sample_rate, frame_ms=FRAME_MS):
+    """Return the loudness of each frame in dBFS"""
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.array([], dtype=np.float32), frame_length
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10)), frame_length
+
+
+def trim_silence(samples, sample_rate, threshold_db=-40.0):
+    """Remove leading and trailing frames quieter than the threshold"""
+    levels, frame_length = frame_levels(samples, sample_rate)
+    voiced = np.nonzero(levels > threshold_db)[0]
+    if len(voiced) == 0:
+        return samples[:0]
+    start = voiced[0] * frame_length
+    end = min(len(samples), (voiced[-1] + 1) * frame_length)
+    return samples[start:end]
+
+
+def split_on_pauses(samples, sample_rate, threshold_db=-40.0, min_pause=0.6, max_chunk_seconds=30.0):
+    """
+    Split audio into chunks at pauses.
+
+    Args:
+        samples (np.ndarray): Mono samples
+        sample_rate (int): Sample rate of the samples
+        threshold_db (float): Frames quieter than this count as silence
+        min_pause (float): Seconds of silence that end a chunk
+        max_chunk_seconds (float): Chunks longer than this are cut at their quietest frame
+
+    Returns:
+        list: Sample arrays in their original order
+    """
+    levels, frame_length = frame_levels(samples, sample_rate)
+    if len(levels) == 0:
+        return [samples] if len(samples) else []
+
+    frame_seconds = frame_length / sample_rate
+    min_pause_frames = max(1, int(min_pause / frame_seconds))
+    max_chunk_frames = max(1, int(max_chunk_seconds / frame_seconds))
+
+    # Find cut points in the middle of each long enough pause
+    cuts = []
+    silent_run = 0
+    for index, level in enumerate(levels):
+        if level <= threshold_db:
+            silent_run += 1
+        else:
+            if silent_run >= min_pause_frames:
+                cuts.append(index - silent_run // 2)
+            silent_run = 0
+
+    # Break up chunks that are still too long at their quietest frame
+    boundaries = [0] + cuts + [len(levels)]
+    frame_bounds = []
+    for start, end in zip(boundaries, boundaries[1:]):
+        while end - start > max_chunk_frames:
+            window = levels[start + max_chunk_frames // 2:start + max_chunk_frames]
+            cut = start + max_chunk_frames // 2 + int(np.argmin(window))
+            frame_bounds.append((start, cut))
+            start = cut
+        frame_bounds.append((start, end))
+
+    chunks = []
+    for index, (start, end) in enumerate(frame_bounds):
+        # The last chunk keeps the samples that did not fill a whole frame
+        stop = len(samples) if index == len(frame_bounds) - 1 else end * frame_length
+        chunk = samples[start * frame_length:stop]
+        chunk_levels = levels[start:end]
+        if len(chunk) and np.any(chunk_levels > threshold_db):
+            chunks.append(chunk)
+    return chunks
+
+
+def to_pcm16(samples):
+    """Convert float samples to 16-bit little-endian PCM bytes"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class GoogleSpeechBackend:
+    """Transcribes PCM audio with Google's free speech recognition"""
+
+    def __init__(self, language="en-US"):
+        import speech_recognition as sr
+        self._sr = sr
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm_bytes, sample_rate):
+        audio_data = self._sr.AudioData(pcm_bytes, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio_data, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+
+
+class StubSpeechBackend:
+    """Offline stand-in that simulates a recognizer with a fixed latency per audio second"""
+
+    def __init__(self, seconds_per_audio_second=0.05):
+        self.seconds_per_audio_second = seconds_per_audio_second
+
+    def transcribe(self, pcm_bytes, sample_rate):
+        duration = len(pcm_bytes) / 2 / sample_rate
+        time.sleep(duration * self.seconds_per_audio_second)
+        return f"[{duration:.1f}s of speech]"
+
+
+def make_backend(name=None):
+    """
+    Create a speech backend by name.
+
+    Args:
+        name (str, optional): "google" or "stub". Defaults to QUICKSLIDE_SPEECH_BACKEND or "google".
+    """
+    name = name or os.getenv("QUICKSLIDE_SPEECH_BACKEND", "google")
+    if name == "google":
+        return GoogleSpeechBackend()
+    if name == "stub":
+        return StubSpeechBackend()
+    raise ValueError(f"Unknown speech backend: {name}")
+
+
+class AudioPipeline:
+    def __init__(self, backend=None, target_rate=TARGET_SAMPLE_RATE, threshold_db=-40.0,
+                 min_pause=0.6, max_chunk_seconds=30.0, max_workers=4):
+        """
+        Resample, trim and chunk a recording in memory, then transcribe the chunks concurrently.
+
+        Args:
+            backend (object, optional): Has `transcribe(pcm_bytes, sample_rate) -> str`.
+                Defaults to `make_backend()`.
+            target_rate (int): Sample rate sent to the recognizer
+            threshold_db (float): Frames quieter than this count as silence
+            min_pause (float): Seconds of silence that end a chunk
+            max_chunk_seconds (float): Maximum chunk length
+            max_workers (int): Chunks transcribed at the same time
+        """
+        self.backend = backend or make_backend()
+        self.target_rate = target_rate
+        self.threshold_db = threshold_db
+        self.min_pause = min_pause
+        self.max_chunk_seconds = max_chunk_seconds
+        self.max_workers = max_workers
+
+    def preprocess(self, audio_bytes):
+        """Return the PCM16 chunks to transcribe, in order"""
+        samples, sample_rate = load_wav(audio_bytes)
+        samples = resample(samples, sample_rate, self.target_rate)
+        samples = trim_silence(samples, self.target_rate, self.threshold_db)
+        chunks = split_on_pauses(samples, self.target_rate, self.threshold_db,
+                                 self.min_pause, self.max_chunk_seconds)
+        return [to_pcm16(chunk) for chunk in chunks]
+
+    def transcribe(self, audio_bytes):
+        """
+        Transcribe a WAV recording.
+
+        Args:
+            audio_bytes (bytes): A PCM WAV file
+
+        Returns:
+            str: The stitched transcript, or an empty string if nothing was recognized
+        """
+        chunks = self.preprocess(audio_bytes)
+        if not chunks:
+            return ""
+        if len(chunks) == 1:
+            return self.backend.transcribe(chunks[0], self.target_rate).strip()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            texts = list(executor.map(lambda chunk: self.backend.transcribe(chunk, self.target_rate), chunks))
+        return " ".join(text.strip() for text in texts if text and text.strip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preprocess and transcribe a WAV file, printing timings.")
+    parser.add_argument("wav", help="Path to a PCM WAV file")
+    parser.add_argument("--backend", default="stub", help="Speech backend: stub or google (default: stub)")
+    parser.add_argument("--workers", type=int, default=4, help="Chunks transcribed at the same time")
+    args = parser.parse_args(argv)
+
+    with open(args.wav, "rb") as f:
+        audio_bytes = f.read()
+
+    audio = AudioPipeline(backend=make_backend(args.backend), max_workers=args.workers)
+    start = time.perf_counter()
+    chunks = audio.preprocess(audio_bytes)
+    preprocess_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text = audio.transcribe(audio_bytes)
+    total_seconds = time.perf_counter() - start
+
+    print(f"Input: {len(audio_bytes) / 1024:.1f} KB, sent: {sum(len(c) for c in chunks) / 1024:.1f} KB in {len(chunks)} chunks")
+    print(f"Preprocess: {preprocess_seconds * 1000:.1f} ms, transcribe: {total_seconds * 1000:.1f} ms")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
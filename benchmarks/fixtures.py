@@ -0,0 +1,166 @@
+#benchmarks/fixtures.py
+import io
+import random
+import zipfile
+import pandas as pd
+from document_extractor import Document
+
+WORDS = (
+    "market growth adoption platform customers revenue strategy analysis data model "
+    "efficiency automation risk compliance innovation research partners quality cost "
+    "performance roadmap security cloud network insight forecast operations talent"
+).split()
+
+
+def _sentence(rng, min_words=6, max_words=14):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    # Sprinkle in the markdown formatting the model produces
+    if rng.random() < 0.3:
+        words[0] = f"**{words[0]}**"
+    if rng.random() < 0.2:
+        words[-1] = f"*{words[-1]}*"
+    return " ".join(words).capitalize() + "."
+
+
+def make_bullet(rng):
+    """A bullet point; about a third are long enough to be split by the generator"""
+    if rng.random() < 0.35:
+        return " ".join(_sentence(rng, 10, 18) for _ in range(rng.randint(2, 3)))
+    return _sentence(rng)
+
+
+def make_deck_content(target_slides, seed=0):
+    """
+    Build deterministic deck content shaped like a model response for the given slide count.
+
+    Args:
+        target_slides (int): Requested number of slides
+        seed (int): Random seed
+
+    Returns:
+        dict: Content accepted by `PPTGenerator.generate_from_content`
+    """
+    rng = random.Random(seed * 100003 + target_slides)
+    section_count = max(1, target_slides // 6)
+    major_count = max(1, section_count // 2)
+    content_slides = max(section_count, target_slides - 2 - major_count)
+    bullets_per_section = max(3, (content_slides * 5) // section_count)
+
+    sections = []
+    for index in range(section_count):
+        major = index * major_count // section_count + 1
+        sections.append({
+            "title": f"Topic {major}: Part {index + 1}",
+            "content": [make_bullet(rng) for _ in range(rng.randint(bullets_per_section - 2, bullets_per_section + 2))],
+        })
+
+    return {
+        "title": f"Benchmark Deck ({target_slides} slides)",
+        "subtitle": "Synthetic content",
+        "target_slides": target_slides,
+        "sections": sections,
+        "call_to_action": "Review the findings and agree on next steps.",
+    }
+
+
+def make_prompt(paragraphs=10, seed=0):
+    """A user prompt with embedded general and per-slide instructions"""
+    rng = random.Random(seed)
+    parts = []
+    for index in range(paragraphs):
+        parts.append(" ".join(_sentence(rng) for _ in range(4)))
+        if index % 3 == 0:
+            parts.append("The presentation should focus on practical outcomes.")
+        if index % 4 == 1:
+            parts.append(f"Slide {index + 3} should show a summary table.")
+        if index % 5 == 2:
+            parts.append(f"Leave slide {index + 2} blank")
+    return "\n\n".join(parts) + "\n\nTarget exactly 15 slides total."
+
+
+def _make_pdf(lines):
+    # Minimal single-page PDF with one text object; enough for PyPDF2 to extract
+    text_ops = ["BT", "/F1 10 Tf", "40 800 Td", "12 TL"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        text_ops.append(f"({escaped}) '")
+    text_ops.append("ET")
+    stream = "\n".join(text_ops).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def _make_docx(paragraphs):
+    # Minimal Word package; docx2txt only reads word/document.xml
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", content_types)
+        package.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+def _make_frame(rows, seed):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "region": [rng.choice(["North", "South", "East", "West"]) for _ in range(rows)],
+        "product": [rng.choice(WORDS) for _ in range(rows)],
+        "units": [rng.randint(1, 500) for _ in range(rows)],
+        "revenue": [round(rng.uniform(100, 50000), 2) for _ in range(rows)],
+    })
+
+
+def make_documents(paragraphs=200, rows=2000, seed=0):
+    """
+    Build one reference document per supported file type.
+
+    Returns:
+        dict: File extension -> `Document`
+    """
+    rng = random.Random(seed)
+    texts = [" ".join(_sentence(rng) for _ in range(3)) for _ in range(paragraphs)]
+    frame = _make_frame(rows, seed)
+
+    csv_bytes = frame.to_csv(index=False).encode("utf-8")
+    xlsx_buffer = io.BytesIO()
+    frame.to_excel(xlsx_buffer, index=False)
+
+    return {
+        ".txt": Document("reference.txt", "\n\n".join(texts).encode("utf-8")),
+        ".docx": Document("reference.docx", _make_docx(texts)),
+        ".pdf": Document("reference.pdf", _make_pdf(" ".join(texts).split(". ")[:60])),
+        ".csv": Document("reference.csv", csv_bytes),
+        ".xlsx": Document("reference.xlsx", xlsx_buffer.getvalue()),
+    }
@@ -0,0 +1,324 @@
+#benchmarks/load_test.py
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.fixtures import make_documents, make_prompt
+from benchmarks.mock_mistral import LatencyModel, MockMistralServer
+from artifact_store import ArtifactStore
+from pipeline import STAGES, THEMES, run_generation
+from render_cache import RenderCache
+from section_cache import section_cache
+
+# Request profiles the input mix is drawn from
+PROFILES = {
+    "short": {"num_slides": 10, "detailed": False},
+    "standard": {"num_slides": 15, "detailed": True},
+    "long": {"num_slides": 25, "detailed": True},
+    "txt": {"num_slides": 15, "detailed": True, "document": ".txt"},
+    "pdf": {"num_slides": 15, "detailed": True, "document": ".pdf"},
+    "docx": {"num_slides": 15, "detailed": True, "document": ".docx"},
+    "csv": {"num_slides": 15, "detailed": True, "document": ".csv"},
+    "xlsx": {"num_slides": 15, "detailed": True, "document": ".xlsx"},
+}
+DEFAULT_MIX = "standard=4,short=3,pdf=1,docx=1,xlsx=1"
+MEMORY_SAMPLE_SECONDS = 0.1
+
+
+def parse_mix(text):
+    """Turn "standard=4,pdf=1" into [(profile, weight), ...]"""
+    mix = []
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in PROFILES:
+            raise ValueError(f"Unknown profile '{name}'. Choose from: {', '.join(PROFILES)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50_s": percentile(values, 0.50),
+        "p95_s": percentile(values, 0.95),
+        "p99_s": percentile(values, 0.99),
+        "max_s": max(values) if values else None,
+    }
+
+
+def _rss_bytes():
+    # Current resident set size; /proc is Linux-only, elsewhere fall back to the peak
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return _peak_rss_bytes()
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _cpu_seconds():
+    # Child processes only report once they have exited; the extraction pool's live workers
+    # are counted from /proc instead, where available
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total + _live_children_cpu_seconds()
+
+
+def _live_children_cpu_seconds():
+    total = 0.0
+    # Each thread lists the children it started; the pool is started by whichever thread needs it first
+    children = set()
+    try:
+        for task in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{task}/children", "r") as f:
+                children.update(f.read().split())
+    except OSError:
+        return total
+    ticks = os.sysconf("SC_CLK_TCK")
+    for pid in children:
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                # utime and stime are fields 14 and 15, after the parenthesised command name
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += (int(fields[11]) + int(fields[12])) / ticks
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class ResourceMonitor:
+    """Samples CPU time of this process and its children, and memory of this process, while a load level runs"""
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self.rss_start = _rss_bytes()
+        self.rss_peak = self.rss_start
+        self.rss_samples = []
+        self._cpu_start = _cpu_seconds()
+        self._wall_start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.cpu_seconds = _cpu_seconds() - self._cpu_start
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(MEMORY_SAMPLE_SECONDS):
+            rss = _rss_bytes()
+            self.rss_samples.append(rss)
+            self.rss_peak = max(self.rss_peak, rss)
+
+    def report(self):
+        return {
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            # 1.0 is one fully busy core
+            "cpu_cores_used": round(self.cpu_seconds / self.wall_seconds, 3) if self.wall_seconds else 0,
+            "rss_start_mb": round(self.rss_start / 2**20, 1),
+            "rss_mean_mb": round(sum(self.rss_samples) / len(self.rss_samples) / 2**20, 1) if self.rss_samples else None,
+            "rss_peak_mb": round(self.rss_peak / 2**20, 1),
+        }
+
+
+def run_request(profile, documents, cache, rng):
+    """
+    Run one generation through the pipeline and time each stage.
+
+    Returns:
+        dict: profile, ok, error and seconds per stage plus "total"
+    """
+    settings = PROFILES[profile]
+    marks = []
+    documents = [documents[settings["document"]]] if "document" in settings else None
+    start = time.perf_counter()
+    error = None
+    try:
+        run_generation(
+            make_prompt(3, seed=rng.randrange(1 << 30)),
+            cache,
+            num_slides=settings["num_slides"],
+            detailed=settings["detailed"],
+            theme=rng.choice(THEMES),
+            documents=documents,
+            progress=lambda stage: marks.append((stage, time.perf_counter())),
+        )
+    except Exception as e:
+        error = str(e)
+    end = time.perf_counter()
+
+    # Each stage lasts until the next one starts; the last one until the pipeline returns
+    stages = {}
+    for (stage, started), (_, finished) in zip(marks, marks[1:] + [(None, end)]):
+        stages[stage] = stages.get(stage, 0.0) + finished - started
+    stages["total"] = end - start
+    return {"profile": profile, "ok": error is None, "error": error, "stages": stages}
+
+
+def run_level(users, requests_per_user, duration, mix, documents, cache, seed):
+    """
+    Drive the pipeline with `users` concurrent virtual users.
+
+    Each user sends requests back to back until it has sent `requests_per_user`,
+    or until `duration` seconds have passed when a duration is given.
+
+    Returns:
+        dict: Throughput, latency percentiles per stage, errors and resource usage
+    """
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        results = []
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif len(results) >= requests_per_user:
+                break
+            results.append(run_request(rng.choices(names, weights)[0], documents, cache, rng))
+        return results
+
+    with ResourceMonitor() as monitor:
+        with ThreadPoolExecutor(max_workers=users, thread_name_prefix="quickslide-vu") as executor:
+            results = [result for batch in executor.map(user, range(users)) for result in batch]
+
+    completed = [result for result in results if result["ok"]]
+    stage_names = STAGES + ["total"]
+    latencies = {
+        stage: summarize([result["stages"][stage] for result in completed if stage in result["stages"]])
+        for stage in stage_names
+    }
+    errors = {}
+    for result in results:
+        if not result["ok"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+    profiles = {}
+    for result in results:
+        profiles[result["profile"]] = profiles.get(result["profile"], 0) + 1
+
+    return {
+        "users": users,
+        "requests": len(results),
+        "completed": len(completed),
+        "failed": len(results) - len(completed),
+        "wall_seconds": round(monitor.wall_seconds, 3),
+        "throughput_rps": round(len(completed) / monitor.wall_seconds, 3) if monitor.wall_seconds else 0,
+        "latency": latencies,
+        "profiles": profiles,
+        "errors": errors,
+        "resources": monitor.report(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the generation pipeline with concurrent virtual users.")
+    parser.add_argument("--users", default="1,4,8",
+                        help="Concurrent virtual users; a comma-separated list runs each level in turn (default: 1,4,8)")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per user at each level (default: 5)")
+    parser.add_argument("--duration", type=float, help="Run each level for this many seconds instead of a request count")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Weighted input mix from: {', '.join(PROFILES)} (default: {DEFAULT_MIX})")
+    parser.add_argument("--latency", type=float, default=2.0, help="Median mock model latency in seconds (default: 2.0)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal spread of the latency (default: 0.5)")
+    parser.add_argument("--per-token", type=float, default=0.0, help="Extra mock latency per output token")
+    parser.add_argument("--mock-url", help="Use an already running mock or real API instead of starting one in-process")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the input mix and latencies")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--max-p95", type=float,
+                        help="Exit with 1 if the end-to-end p95 at any level exceeds this many seconds")
+    args = parser.parse_args(argv)
+
+    levels = [int(users) for users in args.users.split(",")]
+    mix = parse_mix(args.mix)
+    documents = make_documents(seed=args.seed)
+
+    os.environ.setdefault("MISTRAL_API_KEY", "load-test")
+
+    server = None
+    if args.mock_url:
+        os.environ["MISTRAL_BASE_URL"] = args.mock_url
+    else:
+        server = MockMistralServer(LatencyModel(args.latency, args.sigma, args.per_token, seed=args.seed)).start()
+        os.environ["MISTRAL_BASE_URL"] = server.base_url
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "mix": dict(mix),
+            "mock": args.mock_url or {"median_s": args.latency, "sigma": args.sigma, "per_token_s": args.per_token},
+        },
+        "levels": [],
+    }
+    try:
+        for users in levels:
+            # Every level replays the same inputs, so each gets a fresh, throwaway store and
+            # empty in-process caches; otherwise later levels would be served from earlier ones
+            artifact_dir = tempfile.mkdtemp(prefix="quickslide-load-")
+            section_cache.clear()
+            try:
+                cache = RenderCache(ArtifactStore(root=artifact_dir))
+                level = run_level(users, args.requests, args.duration, mix, documents, cache, args.seed)
+            finally:
+                shutil.rmtree(artifact_dir, ignore_errors=True)
+            report["levels"].append(level)
+            total = level["latency"]["total"]
+            p50 = f"{total['p50_s']:.2f}s" if total["p50_s"] is not None else "-"
+            p95 = f"{total['p95_s']:.2f}s" if total["p95_s"] is not None else "-"
+            print(f"{users:>4} users: {level['throughput_rps']:.2f} req/s, p50 {p50}, p95 {p95}, "
+                  f"{level['failed']} failed, {level['resources']['cpu_cores_used']:.2f} cores, "
+                  f"{level['resources']['rss_peak_mb']:.0f} MB peak", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.stop()
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.max_p95 is not None:
+        slow = [level for level in report["levels"]
+                if level["latency"]["total"]["p95_s"] is None or level["latency"]["total"]["p95_s"] > args.max_p95]
+        for level in slow:
+            print(f"SLOW {level['users']} users: p95 {level['latency']['total']['p95_s']} s > {args.max_p95} s",
+                  file=sys.stderr)
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
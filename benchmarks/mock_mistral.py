@@ -0,0 +1,152 @@
+#benchmarks/mock_mistral.py
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from benchmarks.fixtures import make_deck_content
+
+
+class LatencyModel:
+    def __init__(self, median=0.0, sigma=0.0, per_output_token=0.0, seed=None):
+        """
+        Response latency of the mock server.
+
+        Args:
+            median (float): Median seconds before the response starts
+            sigma (float): Log-normal spread around the median; 0 gives a fixed latency
+            per_output_token (float): Extra seconds per generated token, like a streaming model
+            seed (int, optional): Random seed for reproducible runs
+        """
+        self.median = median
+        self.sigma = sigma
+        self.per_output_token = per_output_token
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, output_tokens=0):
+        with self._lock:
+            base = self.median * self._rng.lognormvariate(0, self.sigma) if self.sigma else self.median
+        return base + output_tokens * self.per_output_token
+
+
+class MockMistralHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions with synthetic deck JSON sized to the requested slide count"""
+
+    latency = LatencyModel()
+    # Optional per-model latencies, e.g. to make the large model slower than the small one
+    model_latency = {}
+    requests_served = 0
+    _count_lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        messages = body.get("messages", [])
+        system_prompt = messages[0]["content"] if messages else ""
+        user_prompt = messages[-1]["content"] if messages else ""
+
+        match = re.search(r"EXACTLY (\d+) slides", system_prompt)
+        target_slides = int(match.group(1)) if match else 15
+        with self._count_lock:
+            type(self).requests_served += 1
+            seed = type(self).requests_served
+        content = json.dumps(make_deck_content(target_slides, seed=seed))
+
+        # Rough token counts, about four characters per token
+        prompt_tokens = (len(system_prompt) + len(user_prompt)) // 4
+        completion_tokens = len(content) // 4
+        latency = self.model_latency.get(body.get("model"), self.latency)
+        time.sleep(latency.sample(completion_tokens))
+
+        payload = json.dumps({
+            "id": f"mock-{seed}",
+            "object": "chat.completion",
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockMistralServer:
+    def __init__(self, latency=None, host="127.0.0.1", port=0, model_latency=None):
+        """
+        A local stand-in for the Mistral chat completions API, run on a background thread.
+
+        Use as a context manager; `base_url` can be passed to MistralClient through
+        the MISTRAL_BASE_URL environment variable. `model_latency` maps model names to
+        their own LatencyModel; other models use `latency`.
+        """
+        handler = type("BoundMockMistralHandler", (MockMistralHandler,), {
+            "latency": latency or LatencyModel(),
+            "model_latency": dict(model_latency or {}),
+            "requests_served": 0,
+        })
+        self.handler = handler
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests_served(self):
+        return self.handler.requests_served
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a mock Mistral API for offline benchmarking.")
+    parser.add_argument("--port", type=int, default=8600, help="Port to bind (default: 8600)")
+    parser.add_argument("--latency", type=float, default=1.0, help="Median response latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.3, help="Log-normal latency spread")
+    parser.add_argument("--per-token", type=float, default=0.0, help="Extra seconds per output token")
+    args = parser.parse_args(argv)
+
+    server = MockMistralServer(LatencyModel(args.latency, args.sigma, args.per_token), port=args.port)
+    print(f"Mock Mistral API on {server.base_url} (set MISTRAL_BASE_URL to use it)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
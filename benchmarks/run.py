@@ -0,0 +1,226 @@
+#benchmarks/run.py
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from benchmarks.fixtures import make_deck_content, make_documents, make_prompt
+from benchmarks.mock_mistral import LatencyModel, MockMistralServer
+from document_extractor import extract_text_from_file
+from pipeline import THEMES
+from pptx import Presentation
+from ppt_generator import PPTGenerator
+from section_cache import section_cache
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SLIDE_COUNTS = [10, 100, 1000]
+QUICK_SLIDE_COUNTS = [10, 100]
+# Changes smaller than this are treated as noise regardless of the ratio
+NOISE_FLOOR_SECONDS = 0.002
+
+
+def measure(func, repeats, setup=None):
+    """
+    Time a function several times.
+
+    Args:
+        func (callable): Called with the value returned by setup, if any
+        repeats (int): Number of timed runs
+        setup (callable, optional): Untimed preparation run before each call
+
+    Returns:
+        dict: median, min and mean seconds plus the number of runs
+    """
+    timings = []
+    for _ in range(repeats):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "mean_s": statistics.mean(timings),
+        "runs": repeats,
+    }
+
+
+def _fresh_generator(theme="modern_blue"):
+    # Every repeat renders the same deck, so drop sections cached by the previous one
+    section_cache.clear()
+    return PPTGenerator(theme=theme)
+
+
+def _deck_outline(ppt):
+    # Titles and shapes as python-pptx sees them in memory and after a save and reload
+    buffer = io.BytesIO()
+    ppt.save(buffer)
+    return [
+        [
+            (slide.shapes.title.text if slide.shapes.title is not None else None,
+             [(shape.shape_type, shape.name, shape.text_frame.text if shape.has_text_frame else None)
+              for shape in slide.shapes])
+            for slide in deck.slides
+        ]
+        for deck in (ppt, Presentation(buffer))
+    ]
+
+
+def check_section_cache(content, theme="modern_blue"):
+    """Fail if a deck served from the section cache differs from a cold render"""
+    cold, _ = _fresh_generator(theme).generate_from_content(content)
+    cached, _ = PPTGenerator(theme=theme).generate_from_content(content)
+    if _deck_outline(cold) != _deck_outline(cached):
+        raise AssertionError(f"Section cache changed the rendered deck for theme {theme}")
+
+
+def bench_render(results, slide_counts, repeats):
+    for slides in slide_counts:
+        content = make_deck_content(slides)
+        for theme in THEMES:
+            results[f"render/{theme}/{slides}"] = measure(
+                lambda gen: gen.generate_from_content(content), repeats, setup=lambda: _fresh_generator(theme)
+            )
+
+        # Every section already cached, as for a variant of a recent deck
+        check_section_cache(content)
+        results[f"render_cached/{slides}"] = measure(
+            lambda gen: gen.generate_from_content(content), repeats, setup=PPTGenerator
+        )
+
+        def render_for_save():
+            gen = _fresh_generator()
+            gen.generate_from_content(content)
+            return gen
+        results[f"save/{slides}"] = measure(lambda gen: gen.ppt.save(io.BytesIO()), repeats, setup=render_for_save)
+
+
+def bench_distribution(results, slide_counts, repeats):
+    gen = PPTGenerator()
+    for slides in slide_counts:
+        content = make_deck_content(slides)
+        sections = content["sections"]
+        allocation = gen._allocate_section_slides(sections, slides)
+
+        def distribute():
+            for section, max_slides in zip(sections, allocation):
+                gen._distribute_content(section["title"], section["content"], max_slides=max_slides)
+        results[f"distribute_content/{slides}"] = measure(distribute, repeats)
+
+        bullets = [bullet for section in sections for bullet in section["content"]]
+
+        def split():
+            for bullet in bullets:
+                gen._split_long_bullet(bullet)
+        results[f"split_long_bullet/{slides}"] = measure(split, repeats)
+
+
+def bench_instructions(results, repeats):
+    # The client is only used for its regex parser, so no real key is needed
+    os.environ.setdefault("MISTRAL_API_KEY", "benchmark")
+    from mistral_client import MistralClient
+    client = MistralClient()
+    for paragraphs in (10, 100, 1000):
+        prompt = make_prompt(paragraphs)
+        results[f"extract_instructions/{paragraphs}"] = measure(
+            lambda: client.extract_presentation_instructions(prompt), repeats
+        )
+
+
+def bench_extraction(results, repeats):
+    for extension, document in make_documents().items():
+        results[f"extract_file/{extension.lstrip('.')}"] = measure(lambda: extract_text_from_file(document), repeats)
+
+
+def bench_generate_content(results, repeats, latency):
+    with MockMistralServer(LatencyModel(median=latency)) as server:
+        os.environ["MISTRAL_BASE_URL"] = server.base_url
+        os.environ.setdefault("MISTRAL_API_KEY", "benchmark")
+        from mistral_client import MistralClient
+        client = MistralClient()
+        for slides in (10, 25):
+            prompt = make_prompt(10).replace("Target exactly 15 slides", f"Target exactly {slides} slides")
+            results[f"generate_content/mock/{slides}"] = measure(lambda: client.generate_content(prompt), repeats)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare median timings against a baseline.
+
+    Returns:
+        list: (name, baseline median, current median, ratio) for each regression
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        base, now = previous["median_s"], current["median_s"]
+        ratio = now / base if base else float("inf")
+        current["baseline_median_s"] = base
+        current["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance and now - base > NOISE_FLOOR_SECONDS:
+            regressions.append((name, base, now, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the presentation generation pipeline.")
+    parser.add_argument("--quick", action="store_true", help="Skip the 1,000-slide fixtures")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--mock-latency", type=float, default=0.0,
+                        help="Seconds the mock Mistral server waits before answering (default: 0)")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before a benchmark counts as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    slide_counts = QUICK_SLIDE_COUNTS if args.quick else SLIDE_COUNTS
+    results = {}
+    bench_render(results, slide_counts, args.repeats)
+    bench_distribution(results, slide_counts, args.repeats)
+    bench_instructions(results, args.repeats)
+    bench_extraction(results, args.repeats)
+    bench_generate_content(results, args.repeats, args.mock_latency)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": args.repeats,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        report["regressions"] = [name for name, _, _, _ in regressions]
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    for name, base, now, ratio in regressions:
+        print(f"REGRESSION {name}: {base * 1000:.1f} ms -> {now * 1000:.1f} ms ({ratio:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
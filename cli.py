@@ -0,0 +1,145 @@
+#cli.py
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from artifact_store import ArtifactStore
+from render_cache import RenderCache
+from exporters import FORMATS, write_exports
+from pipeline import THEMES, generation_kwargs, run_generation
+
+
+def load_jobs(args):
+    """
+    Build the list of job specs from the command line arguments.
+
+    Returns:
+        list: Tuples of (spec, base_dir) where base_dir resolves relative file paths
+    """
+    if args.jobs:
+        base_dir = os.path.dirname(os.path.abspath(args.jobs))
+        jobs = []
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    jobs.append((json.loads(line), base_dir))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{args.jobs}:{line_number}: invalid JSON: {e}")
+    elif args.manifest:
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        jobs = [(spec, os.path.dirname(os.path.abspath(args.manifest)))]
+    else:
+        spec = {
+            "prompt": args.prompt,
+            "num_slides": args.slides,
+            "detailed": not args.concise,
+            "theme": args.theme,
+            "files": args.file or [],
+        }
+        if args.image:
+            spec["image"] = args.image
+        if args.output:
+            spec["output"] = args.output
+        jobs = [(spec, os.getcwd())]
+
+    # --profile applies to every job that does not choose for itself
+    if args.profile:
+        for spec, _ in jobs:
+            if isinstance(spec, dict):
+                spec.setdefault("profile", True)
+    return jobs
+
+
+def run_job(index, spec, base_dir, cache, output_dir, formats=("pptx",)):
+    """
+    Generate one deck and copy it to its output path, writing any extra formats next to it.
+
+    Returns:
+        dict: A result record that is printed as one JSON line
+    """
+    start = time.perf_counter()
+    record = {"index": index, "status": "ok"}
+    try:
+        kwargs = generation_kwargs(spec, base_dir)
+        result = run_generation(cache=cache, **kwargs)
+
+        output = spec.get("output") or f"{index:04d}_{result['file_name']}"
+        output_path = os.path.join(output_dir, output)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        shutil.copyfile(result["file_path"], output_path)
+
+        extra_formats = [name for name in formats if name != "pptx"]
+        if extra_formats:
+            exports = write_exports(result["content"], os.path.splitext(output_path)[0],
+                                    kwargs["theme"], extra_formats, image=kwargs["image"])
+            record["exports"] = exports
+
+        record.update({
+            "output": output_path,
+            "slide_count": result["slide_count"],
+            "reused": result["reused"],
+        })
+    except Exception as e:
+        record.update({"status": "error", "error": str(e)})
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate PowerPoint presentations without the Streamlit UI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("prompt", nargs="?", help="Presentation topic or description")
+    source.add_argument("--manifest", help="JSON file describing a single job")
+    source.add_argument("--jobs", help="JSONL file with one job per line")
+    parser.add_argument("-o", "--output", help="Output .pptx path for a single prompt")
+    parser.add_argument("--output-dir", default=".", help="Directory for generated decks (default: current directory)")
+    parser.add_argument("--slides", type=int, default=15, help="Target number of slides (default: 15)")
+    parser.add_argument("--theme", choices=THEMES, default="modern_blue", help="Presentation theme")
+    parser.add_argument("--concise", action="store_true", help="Generate concise instead of detailed content")
+    parser.add_argument("--file", action="append", help="Reference document; may be given several times")
+    parser.add_argument("--formats", default="pptx",
+                        help=f"Comma-separated output formats from: {', '.join(FORMATS)} (default: pptx)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each generation with cProfile and tracemalloc, unless a job sets \"profile\" itself "
+                             "(see QUICKSLIDE_PROFILE_DIR)")
+    parser.add_argument("--image", help="Cover/logo image for the title, section and closing slides")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("QUICKSLIDE_MAX_WORKERS", "4")),
+                        help="Number of jobs generated at the same time")
+    args = parser.parse_args(argv)
+
+    formats = [name.strip() for name in args.formats.split(",") if name.strip()]
+    unknown = [name for name in formats if name not in FORMATS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+
+    try:
+        jobs = load_jobs(args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    cache = RenderCache(ArtifactStore())
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = [
+            executor.submit(run_job, index, spec, base_dir, cache, args.output_dir, formats)
+            for index, (spec, base_dir) in enumerate(jobs)
+        ]
+        # Print each result as soon as it finishes so long batches can be followed
+        for future in as_completed(futures):
+            record = future.result()
+            if record["status"] != "ok":
+                failures += 1
+            print(json.dumps(record), flush=True)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
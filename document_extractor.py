@@ -0,0 +1,270 @@
+#document_extractor.py
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import docx2txt
+import PyPDF2
+import pandas as pd
+import metrics
+
+# Per-file cap of `extract_text_from_file`
+MAX_CHARS_PER_FILE = 10000
+# Shared cap for all reference documents of one deck; QUICKSLIDE_REFERENCE_MAX_CHARS overrides it
+DEFAULT_REFERENCE_MAX_CHARS = 60000
+TRUNCATION_NOTE = "\n\n... (content truncated for length)"
+# Parsing these is CPU-bound pure Python, so they are extracted in worker processes
+PROCESS_TYPES = (".pdf", ".xlsx", ".xls")
+
+
+class Document:
+    """A named in-memory file with the same interface as a Streamlit upload"""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+    @classmethod
+    def from_path(cls, path):
+        with open(path, "rb") as f:
+            return cls(os.path.basename(path), f.read())
+
+    def getvalue(self):
+        return self.data
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be read; the message is meant for the user"""
+
+
+def read_document(uploaded_file):
+    """
+    Extract the full text of an uploaded file.
+
+    Args:
+        uploaded_file: Object with `name` and `getvalue()`, e.g. `Document` or a Streamlit upload
+
+    Returns:
+        str: The extracted text
+
+    Raises:
+        ExtractionError: If the file type is not supported or the file cannot be read
+    """
+    text = ""
+    file_extension = os.path.splitext(uploaded_file.name)[1].lower()
+    
+    try:
+        # Handle different file types
+        if file_extension == '.txt':
+            text = uploaded_file.getvalue().decode('utf-8')
+        
+        elif file_extension == '.docx':
+            try:
+                text = docx2txt.process(io.BytesIO(uploaded_file.getvalue()))
+            except Exception as e:
+                raise ExtractionError(f"Error processing DOCX file: {str(e)}. Make sure it's a valid Word document.")
+        
+        elif file_extension == '.pdf':
+            try:
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.getvalue()))
+                for page_num in range(len(pdf_reader.pages)):
+                    text += pdf_reader.pages[page_num].extract_text() + "\n"
+            except Exception as e:
+                raise ExtractionError(f"Error processing PDF file: {str(e)}. Make sure it's a valid PDF document.")
+            
+            # Check if we got any text
+            if not text.strip():
+                raise ExtractionError("The PDF appears to contain scanned images rather than text. Cannot extract content.")
+        
+        elif file_extension in ['.csv', '.xlsx', '.xls']:
+            try:
+                if file_extension == '.csv':
+                    df = pd.read_csv(io.BytesIO(uploaded_file.getvalue()))
+                else:
+                    df = pd.read_excel(io.BytesIO(uploaded_file.getvalue()))
+                
+                # Check if dataframe is empty
+                if df.empty:
+                    raise ExtractionError("The uploaded file appears to be empty.")
+                
+                # Convert the dataframe to a text summary
+                text = f"File summary: {uploaded_file.name}\n\n"
+                text += f"Columns: {', '.join(df.columns.tolist())}\n"
+                text += f"Rows: {len(df)}\n\n"
+                text += "Sample data (first 5 rows):\n"
+                text += df.head().to_string() + "\n\n"
+                text += "Statistical summary:\n"
+                
+                # Add basic statistics for numerical columns
+                numeric_cols = df.select_dtypes(include=['number']).columns
+                if len(numeric_cols) > 0:
+                    text += df[numeric_cols].describe().to_string()
+            except ExtractionError:
+                raise
+            except Exception as e:
+                raise ExtractionError(f"Error processing spreadsheet: {str(e)}. Make sure it's a valid file.")
+        
+        else:
+            raise ExtractionError(f"Unsupported file type: {file_extension}. Please upload a .txt, .docx, .pdf, .csv, or .xlsx file.")
+    
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"Error processing file: {str(e)}")
+    
+    return text
+
+
+# Function to extract text from uploaded files with improved error handling
+def extract_text_from_file(uploaded_file, max_chars=MAX_CHARS_PER_FILE):
+    """
+    Extract the text of an uploaded file, or a message describing why it could not be read.
+
+    Use `read_document` to tell the two apart.
+    """
+    try:
+        text = read_document(uploaded_file)
+    except ExtractionError as e:
+        return str(e)
+    
+    # Truncate very large files to prevent issues
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars] + TRUNCATION_NOTE
+    
+    return text
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    # One pool per process, started on first use and shared by all callers
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        return _process_pool
+
+
+def _extract_timed(document):
+    # Returns (text, error); failures are passed back as values so they cross process boundaries as-is
+    start = time.perf_counter()
+    try:
+        text, error = read_document(document), None
+    except ExtractionError as e:
+        text, error = "", str(e)
+    return text, error, time.perf_counter() - start
+
+
+def fair_share(lengths, budget):
+    """
+    Split a character budget across documents so that no document gets more than it
+    needs and the rest is shared equally among the larger ones.
+
+    Args:
+        lengths (list): Length of each document
+        budget (int): Total characters allowed
+
+    Returns:
+        list: Characters allowed for each document
+    """
+    allowed = [0] * len(lengths)
+    remaining = budget
+    # Smallest first: each takes at most an equal share of what is left
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    for position, index in enumerate(order):
+        share = remaining // (len(order) - position)
+        allowed[index] = min(lengths[index], share)
+        remaining -= allowed[index]
+    return allowed
+
+
+def extract_documents(documents, max_chars=None, max_workers=None):
+    """
+    Extract several reference documents at the same time, within one shared budget.
+
+    The budget is split with `fair_share`, so a large document cannot crowd out the rest.
+
+    Args:
+        documents (list): Objects with `name` and `getvalue()`, e.g. `Document` or Streamlit uploads
+        max_chars (int, optional): Characters kept across all documents. Defaults to
+            QUICKSLIDE_REFERENCE_MAX_CHARS or 60,000
+        max_workers (int, optional): Number of extraction threads
+
+    Returns:
+        list: See `extract_all`, with each text cut to its share of the budget
+    """
+    return apply_budget(extract_all(documents, max_workers), max_chars)
+
+
+def extract_all(documents, max_workers=None):
+    """
+    Extract the full text of several documents concurrently.
+
+    PDF and Excel files are parsed in worker processes, the others on threads.
+
+    Args:
+        documents (list): Objects with `name` and `getvalue()`
+        max_workers (int, optional): Number of extraction threads
+
+    Returns:
+        list: One dict per document, in the given order, with name, status ("ok" or
+            "error"), text, chars, seconds spent extracting, wall_seconds including
+            any wait for a worker, and error
+    """
+    def extract(document):
+        extension = os.path.splitext(document.name)[1].lower()
+        start = time.perf_counter()
+        if extension in PROCESS_TYPES:
+            try:
+                text, error, seconds = _get_process_pool().submit(
+                    _extract_timed, Document(document.name, document.getvalue())
+                ).result()
+            except Exception:
+                # A broken pool should not lose the document; parse it here instead
+                text, error, seconds = _extract_timed(document)
+        else:
+            text, error, seconds = _extract_timed(document)
+        metrics.observe("extract_file", seconds, type=extension.lstrip(".") or "none")
+        return text, error, seconds, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(documents) or 1)) as executor:
+        extracted = list(executor.map(extract, documents))
+
+    results = []
+    for document, (text, error, seconds, wall_seconds) in zip(documents, extracted):
+        results.append({
+            "name": document.name,
+            "status": "error" if error else "ok",
+            "text": text,
+            "chars": len(text),
+            "seconds": seconds,
+            "wall_seconds": wall_seconds,
+            "error": error,
+        })
+    return results
+
+
+def apply_budget(results, max_chars=None):
+    """
+    Cut the text of each successful result to its fair share of `max_chars`.
+
+    `chars` keeps the length before the cut. Defaults to QUICKSLIDE_REFERENCE_MAX_CHARS or 60,000.
+    """
+    if max_chars is None:
+        max_chars = int(os.getenv("QUICKSLIDE_REFERENCE_MAX_CHARS", DEFAULT_REFERENCE_MAX_CHARS))
+    ok = [result for result in results if result["status"] == "ok"]
+    for result, allowed in zip(ok, fair_share([result["chars"] for result in ok], max_chars)):
+        if allowed < result["chars"]:
+            result["text"] = result["text"][:allowed] + TRUNCATION_NOTE
+    return results
+
+
+def combine_documents(results):
+    """Join the text of the successful results, headed by file name when there are several"""
+    ok = [result for result in results if result["status"] == "ok"]
+    if len(ok) == 1:
+        return ok[0]["text"]
+    return "\n\n".join(f"--- {result['name']} ---\n{result['text']}" for result in ok)
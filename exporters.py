@@ -0,0 +1,188 @@
+#exporters.py
+import html
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from ppt_generator import PPTGenerator
+
+FORMATS = ["pptx", "md", "html", "json"]
+
+
+def _inline_html(text):
+    """Escape text and turn **bold** and *italic* markers into HTML"""
+    text = html.escape(text)
+    text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'\*(.*?)\*', r'<em>\1</em>', text)
+    return text
+
+
+def _page_label(slide):
+    """The "n/m" marker shown on sections split over several slides"""
+    if slide["type"] == "content" and slide["total_slides"] > 1:
+        return f"{slide['slide_number']}/{slide['total_slides']}"
+    return ""
+
+
+class PptxExporter:
+    extension = "pptx"
+
+    def __init__(self, image=None):
+        self.image = image
+
+    def export(self, content, plan, theme):
+        generator = PPTGenerator(theme=theme, image=self.image)
+        generator.render_plan(plan)
+        buffer = io.BytesIO()
+        generator.ppt.save(buffer)
+        return buffer.getvalue()
+
+
+class MarkdownExporter:
+    extension = "md"
+
+    def export(self, content, plan, theme):
+        lines = []
+        for slide in plan:
+            page = _page_label(slide)
+            heading = f"## Slide {slide['index']}: {slide['title']}" + (f" ({page})" if page else "")
+            if slide["type"] == "title":
+                lines.append(f"# {slide['title']}")
+                if slide["subtitle"]:
+                    lines.append(f"\n_{slide['subtitle']}_")
+            elif slide["type"] == "section_header":
+                lines.append(f"---\n\n{heading}")
+            elif slide["type"] == "content":
+                lines.append(heading + "\n")
+                lines.extend(f"- {point}" for point in slide["content"])
+            else:
+                lines.append(f"---\n\n{heading}")
+                if slide["content"]:
+                    lines.append(f"\n{slide['content']}")
+            lines.append("")
+        return "\n".join(lines).encode("utf-8")
+
+
+class HtmlExporter:
+    extension = "html"
+
+    def export(self, content, plan, theme):
+        colors = {name: f"#{rgb}" for name, rgb in PPTGenerator(theme=theme).theme_colors.items()}
+        slides = []
+        for slide in plan:
+            title = _inline_html(slide["title"])
+            page = _page_label(slide)
+            if slide["type"] == "title":
+                body = f"<h1>{title}</h1>"
+                if slide["subtitle"]:
+                    body += f"<p class=\"subtitle\">{_inline_html(slide['subtitle'])}</p>"
+            elif slide["type"] == "section_header":
+                body = f"<h2>{title}</h2>"
+            elif slide["type"] == "content":
+                points = "".join(f"<li>{_inline_html(point)}</li>" for point in slide["content"])
+                body = f"<h3>{title}</h3><ul>{points}</ul>"
+            else:
+                body = f"<h2>{title}</h2>"
+                if slide["content"]:
+                    body += f"<p>{_inline_html(slide['content'])}</p>"
+            footer = f"<span class=\"number\">{slide['index']}</span>"
+            if page:
+                footer += f"<span class=\"page\">{page}</span>"
+            slides.append(f"<section class=\"slide {slide['type']}\">{body}<footer>{footer}</footer></section>")
+
+        document_title = html.escape(content.get("title", "Presentation"))
+        style = (
+            f"body{{font-family:Calibri,Arial,sans-serif;background:{colors['background']};color:{colors['text']};margin:0;padding:2rem}}"
+            ".slide{position:relative;width:960px;min-height:540px;margin:0 auto 2rem;padding:3rem;box-sizing:border-box;"
+            "background:#fff;box-shadow:0 2px 8px rgba(0,0,0,.15)}"
+            f".slide.title{{border-top:60px solid {colors['primary']}}}"
+            f".slide.content{{border-top:14px solid {colors['accent']}}}"
+            f".slide.content h3{{color:{colors['primary']};font-size:2rem}}"
+            f".slide.section_header{{background:{colors['primary']};color:#fff;display:flex;align-items:center;justify-content:center}}"
+            f".slide.closing{{background:linear-gradient({colors['secondary']} 50%,{colors['primary']} 50%);color:#fff;text-align:center}}"
+            f".subtitle{{color:{colors['secondary']};font-size:1.5rem}}"
+            "li{font-size:1.4rem;margin:.4rem 0}"
+            "footer{position:absolute;right:1.5rem;bottom:1rem;font-size:.8rem;opacity:.7}"
+            "footer span{margin-left:1rem}"
+        )
+        page = (
+            f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{document_title}</title>"
+            f"<style>{style}</style></head><body>{''.join(slides)}</body></html>"
+        )
+        return page.encode("utf-8")
+
+
+class JsonOutlineExporter:
+    extension = "json"
+
+    def export(self, content, plan, theme):
+        outline = {
+            "title": content.get("title", "Presentation"),
+            "subtitle": content.get("subtitle", ""),
+            "theme": theme,
+            "slide_count": len(plan),
+            "slides": plan,
+        }
+        return json.dumps(outline, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+EXPORTERS = {
+    "pptx": PptxExporter,
+    "md": MarkdownExporter,
+    "html": HtmlExporter,
+    "json": JsonOutlineExporter,
+}
+
+
+def export_deck(content, theme="modern_blue", formats=None, max_workers=None, image=None):
+    """
+    Produce several output formats from one slide plan.
+
+    The sections are distributed and the slides allocated once, so slide numbers and
+    "n/m" pagination are the same in every format. The formats are written concurrently.
+
+    Args:
+        content (dict): Structured content as returned by the model
+        theme (str): Presentation theme name
+        formats (list, optional): Any of FORMATS; defaults to all of them
+        max_workers (int, optional): Number of formats produced at the same time
+        image (str or bytes, optional): Cover/logo image for the PPTX export
+
+    Returns:
+        dict: Format -> file bytes
+    """
+    formats = list(formats or FORMATS)
+    unknown = [name for name in formats if name not in EXPORTERS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}. Choose from: {', '.join(FORMATS)}")
+
+    plan = PPTGenerator(theme=theme).plan_slides(content)
+    with ThreadPoolExecutor(max_workers=max_workers or len(formats)) as executor:
+        exporters = {name: PptxExporter(image) if name == "pptx" else EXPORTERS[name]() for name in formats}
+        futures = {name: executor.submit(exporter.export, content, plan, theme) for name, exporter in exporters.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def write_exports(content, base_path, theme="modern_blue", formats=None, image=None):
+    """
+    Write the exports next to each other, e.g. deck.pptx, deck.md, deck.html and deck.json.
+
+    Args:
+        content (dict): Structured content as returned by the model
+        base_path (str): Output path without extension
+        theme (str): Presentation theme name
+        formats (list, optional): Any of FORMATS; defaults to all of them
+        image (str or bytes, optional): Cover/logo image for the PPTX export
+
+    Returns:
+        dict: Format -> written path
+    """
+    paths = {}
+    for name, data in export_deck(content, theme, formats, image=image).items():
+        path = f"{base_path}.{EXPORTERS[name].extension}"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        paths[name] = path
+    return paths
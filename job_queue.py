@@ -0,0 +1,151 @@
+#job_queue.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pipeline import STAGES
+
+
+class Job:
+    """State of a single background generation job"""
+
+    def __init__(self, job_id, key=None):
+        self.id = job_id
+        self.key = key
+        self.status = "queued"  # queued, running, done or failed
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def snapshot(self):
+        """Return a copy of the job state that is safe to read from another thread"""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_jobs=100):
+        """
+        Run generation jobs on a bounded pool of worker threads.
+
+        Args:
+            max_workers (int): Number of jobs that may run at the same time
+            max_jobs (int): Number of jobs kept in memory; the oldest finished jobs are dropped first
+        """
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quickslide-job")
+        self._jobs = OrderedDict()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, key=None, **kwargs):
+        """
+        Queue a job and return its ID.
+
+        The function is called with a `progress` keyword argument that it should call
+        with each stage name from `pipeline.STAGES` as the stage starts.
+
+        Args:
+            func (callable): The work to run, e.g. `pipeline.run_generation`
+            key (str, optional): Identifies identical requests. If a job with the same key
+                is queued, running or finished successfully, its ID is returned instead of
+                starting a new job, unless the file it produced has since been removed.
+
+        Returns:
+            str: The job ID
+        """
+        with self._lock:
+            if key is not None and key in self._keys:
+                existing = self._jobs.get(self._keys[key])
+                if existing is not None and self._expired(existing):
+                    del self._jobs[existing.id]
+                elif existing is not None and existing.status != "failed":
+                    return existing.id
+
+            job = Job(uuid.uuid4().hex, key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._keys[key] = job.id
+            self._evict()
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown or has been dropped"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def find(self, key):
+        """Return the ID of the job submitted with this key, if it is still known"""
+        with self._lock:
+            job_id = self._keys.get(key)
+            return job_id if job_id in self._jobs else None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, func, args, kwargs):
+        def progress(stage):
+            with self._lock:
+                job.stage = stage
+                if stage in STAGES:
+                    job.progress = STAGES.index(stage) / len(STAGES)
+
+        with self._lock:
+            job.status = "running"
+
+        try:
+            result = func(*args, progress=progress, **kwargs)
+        except Exception as e:
+            with self._lock:
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = time.time()
+            return
+
+        with self._lock:
+            job.status = "done"
+            job.stage = "done"
+            job.progress = 1.0
+            job.result = result
+            job.finished_at = time.time()
+
+    @staticmethod
+    def _expired(job):
+        # A finished job whose file was evicted from the artifact store cannot be served again
+        result = job.result
+        if job.status != "done" or not isinstance(result, dict) or not result.get("file_path"):
+            return False
+        return not os.path.exists(result["file_path"])
+
+    def _evict(self):
+        # Drop the oldest finished jobs once we are over the limit; must hold the lock
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            job = self._jobs[job_id]
+            if job.finished:
+                del self._jobs[job_id]
+                if job.key is not None and self._keys.get(job.key) == job_id:
+                    del self._keys[job.key]
@@ -0,0 +1,113 @@
+#media_cache.py
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+EMU_PER_INCH = 914400
+# Enough resolution for a projected slide without embedding the original file
+DEFAULT_DPI = 150
+
+
+class MediaCache:
+    def __init__(self, max_entries=64, dpi=DEFAULT_DPI, jpeg_quality=85):
+        """
+        Content-addressed cache of images resized to fit a box on a slide.
+
+        Each (image, box size) pair is resized and recompressed once and returns the same
+        bytes afterwards, so python-pptx stores it as a single media part however many
+        slides use it.
+
+        Args:
+            max_entries (int): Number of resized images kept, least recently used dropped first
+            dpi (int): Pixel density of the resized image at its placed size
+            jpeg_quality (int): Quality used when recompressing opaque images as JPEG
+        """
+        self.max_entries = max_entries
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self._entries = OrderedDict()
+        self._digests = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _digest(self, image):
+        # Hash files once per (path, size, mtime) instead of on every slide
+        if isinstance(image, (bytes, bytearray)):
+            return hashlib.sha256(image).hexdigest(), bytes(image)
+
+        stat = os.stat(image)
+        file_key = (os.path.abspath(image), stat.st_size, stat.st_mtime)
+        with self._lock:
+            digest = self._digests.get(file_key)
+        if digest is not None:
+            return digest, None
+
+        with open(image, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._digests[file_key] = digest
+        return digest, data
+
+    def fit(self, image, box_width, box_height):
+        """
+        Resize an image to fit inside a box, keeping its aspect ratio.
+
+        Args:
+            image (str or bytes): Image path or encoded image bytes
+            box_width (int): Box width in EMU
+            box_height (int): Box height in EMU
+
+        Returns:
+            tuple: (image bytes, width in EMU, height in EMU) of the fitted image
+        """
+        digest, data = self._digest(image)
+        key = (digest, int(box_width), int(box_height))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if data is None:
+            with open(image, "rb") as f:
+                data = f.read()
+        entry = self._resize(data, box_width, box_height)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _resize(self, data, box_width, box_height):
+        with Image.open(io.BytesIO(data)) as source:
+            source.load()
+            scale = min(box_width / source.width, box_height / source.height)
+            width_emu, height_emu = int(source.width * scale), int(source.height * scale)
+
+            max_pixels = (
+                max(1, round(width_emu / EMU_PER_INCH * self.dpi)),
+                max(1, round(height_emu / EMU_PER_INCH * self.dpi)),
+            )
+            image = source.copy()
+            # Only ever shrink; small logos are embedded as they are
+            image.thumbnail(max_pixels, Image.LANCZOS)
+
+            output = io.BytesIO()
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            if has_alpha:
+                image.save(output, format="PNG", optimize=True)
+            else:
+                image.convert("RGB").save(output, format="JPEG", quality=self.jpeg_quality, optimize=True)
+        return output.getvalue(), width_emu, height_emu
+
+
+# Shared by all generators in the process
+media_cache = MediaCache()
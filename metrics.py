@@ -0,0 +1,207 @@
+#metrics.py
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from dotenv import load_dotenv
+
+# Load settings from .env file
+load_dotenv()
+
+# Upper bounds of the stage duration histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+logger = logging.getLogger("quickslide.metrics")
+
+_current_request = contextvars.ContextVar("quickslide_request", default=None)
+
+
+class _NullSpan:
+    """Shared no-op span returned when metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _Request:
+    """Collects the spans and counters of one generation for its structured log line"""
+
+    def __init__(self, registry, request_id, fields):
+        self.registry = registry
+        self.request_id = request_id or uuid.uuid4().hex[:12]
+        self.fields = fields
+        self.stages = {}
+        self.counters = {}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.token = _current_request.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_request.reset(self.token)
+        status = "error" if exc_type else "ok"
+        self.registry.inc("requests_total", status=status)
+        record = {
+            "request_id": self.request_id,
+            "status": status,
+            "seconds": round(time.perf_counter() - self.start, 4),
+            "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+            "counters": self.counters,
+        }
+        record.update(self.fields)
+        if exc is not None:
+            record["error"] = str(exc)
+        logger.info(json.dumps(record, default=str))
+        self.registry.flush()
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=None, file_path=None):
+        """
+        In-process counters and stage timings with Prometheus text export.
+
+        Args:
+            enabled (bool, optional): Defaults to QUICKSLIDE_METRICS=1
+            file_path (str, optional): File rewritten with the Prometheus text after each
+                request. Defaults to QUICKSLIDE_METRICS_FILE.
+        """
+        self.enabled = os.getenv("QUICKSLIDE_METRICS", "0") == "1" if enabled is None else enabled
+        self.file_path = file_path or os.getenv("QUICKSLIDE_METRICS_FILE")
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+        if self.enabled and not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+
+    def span(self, stage):
+        """Time a block of code as the given stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def request(self, request_id=None, **fields):
+        """Group the spans and counters inside the block into one structured log line"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Request(self, request_id, fields)
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter, e.g. inc("slides_rendered_total", 12)"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        request = _current_request.get()
+        if request is not None and not labels:
+            request.counters[name] = request.counters.get(name, 0) + value
+
+    def observe(self, stage, seconds, **labels):
+        """Record the duration of a stage, e.g. observe("llm_request", 4.2, model="mistral-small-latest")"""
+        if not self.enabled:
+            return
+        key = (stage, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)}
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][index] += 1
+        request = _current_request.get()
+        if request is not None:
+            request.stages[stage] = request.stages.get(stage, 0.0) + seconds
+
+    def annotate(self, **fields):
+        """Add fields to the structured log line of the current request"""
+        request = _current_request.get()
+        if request is not None:
+            request.fields.update(fields)
+
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, dict(h, buckets=list(h["buckets"]))) for key, h in self._histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"quickslide_{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        if histograms:
+            lines.append("# TYPE quickslide_stage_seconds histogram")
+        for (stage, labels), histogram in histograms:
+            series = ",".join([f'stage="{stage}"'] + [f'{key}="{value}"' for key, value in labels])
+            for bound, count in zip(BUCKETS, histogram["buckets"]):
+                lines.append(f'quickslide_stage_seconds_bucket{{{series},le="{bound}"}} {count}')
+            lines.append(f'quickslide_stage_seconds_bucket{{{series},le="+Inf"}} {histogram["count"]}')
+            lines.append(f'quickslide_stage_seconds_sum{{{series}}} {histogram["sum"]:.6f}')
+            lines.append(f'quickslide_stage_seconds_count{{{series}}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Rewrite the metrics file, if one is configured"""
+        if not self.enabled or not self.file_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, self.file_path)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+# Process-wide registry used by the app, the client and the generator
+registry = MetricsRegistry()
+span = registry.span
+request = registry.request
+inc = registry.inc
+observe = registry.observe
+annotate = registry.annotate
@@ -1,25 +1,32 @@
 #mistral_client.py
 import os
 import requests
-import json
 from dotenv import load_dotenv
 import re
+import time
+import metrics
+import prompt_builder
+import response_parser
+from model_router import router as default_router
 
 # Load API key from .env file
 load_dotenv()
 
 class MistralClient:
-    def __init__(self):
+    def __init__(self, router=None):
         # Get API key from environment variables
         self.api_key = os.getenv("MISTRAL_API_KEY")
         if not self.api_key:
             raise ValueError("MISTRAL_API_KEY not found in environment variables")
         
-        self.base_url = "https://api.mistral.ai/v1"
+        # Allow pointing at a compatible server, e.g. the local mock used by the benchmarks
+        self.base_url = os.getenv("MISTRAL_BASE_URL", "https://api.mistral.ai/v1")
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # Picks the model per request; shared by default so latency history carries over
+        self.router = router or default_router
     
     def extract_presentation_instructions(self, text):
         """
@@ -79,19 +86,24 @@ class MistralClient:
         
         return instructions
     
-    def generate_content(self, prompt, detailed=True):
+    def prepare_request(self, prompt, detailed=True):
         """
-        Generate content using Mistral AI based on the prompt.
+        Build the messages for a content request without calling the API.
+
+        This is the CPU-bound part of `generate_content`, so it can run ahead of time,
+        e.g. speculatively while the user is still filling in the form.
 
         Args:
             prompt (str): The user's comprehensive input prompt
             detailed (bool): Whether to generate detailed content
 
         Returns:
-            dict: Generated content in structured format
+            dict: prompt, detailed, target_slides, system_prompt, enhanced_prompt and the
+                estimated tokens of the appended instruction lines
         """
         # Extract instructions from the entire prompt
-        instructions = self.extract_presentation_instructions(prompt)
+        with metrics.span("parse_instructions"):
+            instructions = self.extract_presentation_instructions(prompt)
         
         # Extract slide count from the prompt
         slide_count_match = re.search(r'Target exactly (\d+) slides total', prompt)
@@ -110,84 +122,168 @@ class MistralClient:
                 for instr in instructions.get("slide_instructions", []):
                     enhanced_prompt += f"\n- Make slide {instr['slide_number']} {instr['action']}"
 
-        # Set detail level based on user preference
-        detail_level = "highly detailed and comprehensive" if detailed else "concise and focused"
-        
-        # System prompt with updated instructions
-        system_prompt = f"""
-        You are an expert presentation content creator specializing in insightful and {detail_level} AI-driven presentations.
-        
-        **Instructions:**
-        - Create a **well-structured** presentation based on the user's input.
-        - CRITICALLY IMPORTANT: Generate EXACTLY {target_slides} slides total, including title and closing slides.
-        - You MUST output content that will result in EXACTLY {target_slides} slides when processed.
-        - If specific slide instructions are provided (like 'leave slide 3 blank'), you MUST follow them exactly.
-        - Ensure the presentation has a **logical flow** with clear progression between topics.
-        - Include **real-world examples, case studies, and statistics** where relevant.
-        - Balance **technical depth** while keeping it engaging for a general audience.
-        - Use **rich text formatting** in your content points:
-            - Use **double asterisks** for important terms or concepts that should be bold
-            - Use *single asterisks* for terms that should be italic
-        
-        **Format Requirements:**
-        Your response should be a **JSON object** with the following structure:
-
-        {{
-            "title": "Presentation Title",
-            "subtitle": "Optional Subtitle",
-            "target_slides": {target_slides},
-            "sections": [
-                {{
-                    "title": "Section Title",
-                    "content": ["Point 1 with **bold** and *italic* text", "Point 2", "Point 3"]
-                }}
-            ],
-            "call_to_action": "Key takeaways and next steps",
-            "special_instructions": []
-        }}
-        
-        **Important Notes for Achieving {target_slides} Slides:** 
-        - The presentation will ALWAYS include title and closing slides (2 slides total).
-        - Each major section (before the colon in section titles) gets a section header slide.
-        - Content slides have a maximum of 7 bullet points each.
-        - If a section has more bullet points, it will be split across multiple slides.
-        - To ensure you hit exactly {target_slides} slides:
-        1. Carefully plan your major sections (each adds 1 slide)
-        2. Adjust the number of content bullet points to achieve the right slide count
-        3. Include the exact "target_slides" value of {target_slides} in your JSON response
+        # The system prompt is rendered once per detail level and slide count
+        system_prompt, _ = prompt_builder.system_prompt(detailed, target_slides)
+
+        return {
+            "prompt": prompt,
+            "detailed": detailed,
+            "target_slides": target_slides,
+            "system_prompt": system_prompt,
+            "enhanced_prompt": enhanced_prompt,
+            "instruction_tokens": prompt_builder.estimate_tokens(enhanced_prompt[len(prompt):]),
+        }
+
+    def generate_content(self, prompt, detailed=True, reference_chars=0, budget=None, prepared=None):
         """
-        
-        # Call Mistral API
-        try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json={
-                    "model": "mistral-large-latest",
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": enhanced_prompt}
-                    ],
-                    "temperature": 0.7,
-                    "response_format": {"type": "json_object"}
-                }
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract the JSON content from the response
+        Generate content using Mistral AI based on the prompt.
+
+        The model is chosen by the router from the detail level, slide count and amount of
+        reference material. A model that does not answer within its share of the latency
+        budget is abandoned for the next faster one.
+
+        Args:
+            prompt (str): The user's comprehensive input prompt
+            detailed (bool): Whether to generate detailed content
+            reference_chars (int): Size of the reference material included in the prompt
+            budget (float, optional): Seconds the model call may take; defaults to the router's budget
+            prepared (dict, optional): Result of `prepare_request`; used only if it was built
+                from the same prompt and detail level
+
+        Returns:
+            dict: Generated content in structured format
+        """
+        if prepared is None or prepared["prompt"] != prompt or prepared["detailed"] != detailed:
+            prepared = self.prepare_request(prompt, detailed)
+        target_slides = prepared["target_slides"]
+        system_prompt = prepared["system_prompt"]
+        enhanced_prompt = prepared["enhanced_prompt"]
+        metrics.annotate(instruction_tokens=prepared["instruction_tokens"])
+
+        route = self.router.route(detailed, target_slides, reference_chars, budget)
+        metrics.inc("llm_routes_total", model=route.model, reason=route.reason)
+        metrics.annotate(model=route.model, route_reason=route.reason)
+
+        # Call Mistral API, falling back to faster models as the budget runs out
+        started = time.perf_counter()
+        for attempt, model in enumerate(route.models):
+            has_fallback = attempt < len(route.models) - 1
+            remaining = route.budget - (time.perf_counter() - started)
+            # Nothing is streamed back, so the read timeout bounds the whole generation
+            timeout = self.router.attempt_timeout(remaining, has_fallback)
+            attempt_start = time.perf_counter()
             try:
-                content = result["choices"][0]["message"]["content"]
-                data = json.loads(content)
-                
-                # Ensure target_slides is included
-                if "target_slides" not in data:
-                    data["target_slides"] = target_slides
-                    
-                return data
-            except (KeyError, json.JSONDecodeError) as e:
-                return {"error": f"Failed to parse response: {str(e)}"}
-                
-        except requests.exceptions.RequestException as e:
-            return {"error": f"API request failed: {str(e)}"}
\ No newline at end of file
+                result = self._chat(model, system_prompt, enhanced_prompt, timeout)
+            except requests.exceptions.Timeout as e:
+                elapsed = time.perf_counter() - attempt_start
+                self.router.record(model, elapsed)
+                metrics.observe("llm_request", elapsed, model=model)
+                if not has_fallback:
+                    return {"error": f"API request timed out after {route.budget:.0f}s: {str(e)}"}
+                metrics.inc("llm_fallbacks_total", from_model=model, to_model=route.models[attempt + 1])
+                metrics.annotate(model=route.models[attempt + 1], fallback_from=model)
+                continue
+            except requests.exceptions.RequestException as e:
+                return {"error": f"API request failed: {str(e)}"}
+
+            elapsed = time.perf_counter() - attempt_start
+            self.router.record(model, elapsed)
+            metrics.observe("llm_request", elapsed, model=model)
+            break
+
+        # Extract the JSON content from the response
+        try:
+            content = result["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            return {"error": f"Failed to parse response: {str(e)}"}
+
+        # Keep what survives of a cut-off or malformed answer instead of failing the request
+        data, outcome = response_parser.parse_deck(content)
+        metrics.inc("llm_response_parse_total", outcome=outcome)
+        if data is None:
+            return {"error": "Failed to parse response: the model did not return a JSON object"}
+        deck = response_parser.normalize_deck(data, target_slides)
+
+        # Ask only for the missing sections when too few complete ones were recovered
+        if outcome == "truncated":
+            needed = response_parser.missing_sections(deck, target_slides)
+            remaining = route.budget - (time.perf_counter() - started)
+            if needed and remaining > 1:
+                deck = self._continue_deck(model, deck, needed, prompt, remaining)
+
+        # A valid answer is used as sent; a recovered one needs at least one section to be worth rendering
+        if outcome != "ok" and not deck["sections"]:
+            return {"error": "Failed to parse response: no complete sections in the model output"}
+        if outcome != "ok":
+            # A malformed answer that still produced a deck spares the user a full regeneration
+            metrics.inc("llm_round_trips_saved_total")
+        metrics.annotate(response_parse=outcome, sections=len(deck["sections"]))
+        return deck
+
+    def _chat(self, model, system_prompt, user_prompt, timeout):
+        """
+        Send one chat completion request in JSON mode and count its tokens.
+
+        Returns:
+            dict: The decoded API response
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails or times out
+        """
+        response = requests.post(
+            f"{self.base_url}/chat/completions",
+            headers=self.headers,
+            json={
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": 0.7,
+                "response_format": {"type": "json_object"}
+            },
+            timeout=max(timeout, 1)
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        # Count tokens as reported by the API
+        usage = result.get("usage") or {}
+        metrics.inc("tokens_in_total", usage.get("prompt_tokens", 0))
+        metrics.inc("tokens_out_total", usage.get("completion_tokens", 0))
+        return result
+
+    def _continue_deck(self, model, deck, needed, prompt, timeout):
+        """
+        Complete a cut-off deck with a short follow-up request for its missing sections.
+
+        Args:
+            model (str): The model that produced the cut-off answer
+            deck (dict): The recovered deck, normalized
+            needed (int): Number of sections to ask for
+            prompt (str): The original user message
+            timeout (float): Seconds left of the latency budget
+
+        Returns:
+            dict: The deck with the new sections appended, or unchanged if the follow-up failed
+        """
+        system_prompt, user_prompt = prompt_builder.continuation_prompt(deck, needed, prompt)
+        try:
+            # Timed as its own stage; the short follow-up must not skew the model's latency history
+            with metrics.span("llm_continuation"):
+                result = self._chat(model, system_prompt, user_prompt, timeout)
+            content = result["choices"][0]["message"]["content"]
+        except (requests.exceptions.RequestException, ValueError, KeyError, IndexError, TypeError):
+            metrics.inc("llm_continuations_total", outcome="failed")
+            return deck
+
+        data, _ = response_parser.parse_deck(content)
+        sections = response_parser.normalize_deck(data or {}, deck["target_slides"])["sections"]
+        known = {section["title"] for section in deck["sections"]}
+        sections = [section for section in sections if section["title"] not in known][:needed]
+        metrics.inc("llm_continuations_total", outcome="ok" if sections else "empty")
+
+        deck = dict(deck, sections=deck["sections"] + sections)
+        if not deck["call_to_action"] and data:
+            deck["call_to_action"] = str(data.get("call_to_action") or "")
+        return deck
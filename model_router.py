@@ -0,0 +1,119 @@
+#model_router.py
+import os
+import threading
+import time
+from collections import deque
+from dotenv import load_dotenv
+
+# Load settings from .env file
+load_dotenv()
+
+# Most capable first; a request falls back towards the end of the list
+DEFAULT_MODELS = ["mistral-large-latest", "mistral-medium-latest", "mistral-small-latest"]
+DEFAULT_BUDGET_SECONDS = 90
+# Share of the remaining budget a model gets before the request moves on to a faster one
+ATTEMPT_SHARE = 0.7
+# Recent latencies kept per model, and how many are needed before they affect routing
+HISTORY = 50
+MIN_SAMPLES = 5
+# Older samples are ignored, so a model skipped for being slow is tried again later
+HISTORY_SECONDS = 600
+# Request features that call for a more capable model
+LONG_DECK_SLIDES = 15
+LARGE_REFERENCE_CHARS = 8000
+
+
+class Route:
+    def __init__(self, models, reason, budget):
+        """
+        The routing decision for one request.
+
+        Args:
+            models (list): The chosen model followed by its faster fallbacks
+            reason (str): "features" when picked from the request, "budget" when the
+                recent latency of a more capable model would not fit the budget
+            budget (float): Seconds the whole model call may take
+        """
+        self.models = models
+        self.reason = reason
+        self.budget = budget
+
+    @property
+    def model(self):
+        return self.models[0]
+
+
+class ModelRouter:
+    def __init__(self, models=None, budget=None, attempt_share=ATTEMPT_SHARE):
+        """
+        Pick a model per request and keep the call within a latency budget.
+
+        Concise, short decks without much reference material go to the fastest model;
+        detailed, long or reference-heavy decks go to the most capable one. A model whose
+        recent 90th percentile latency would not fit its share of the budget is skipped.
+
+        Args:
+            models (list, optional): Model names, most capable first. Defaults to the
+                comma-separated MISTRAL_MODELS, or large/medium/small
+            budget (float, optional): Seconds per request. Defaults to QUICKSLIDE_LLM_BUDGET or 90
+            attempt_share (float): Share of the remaining budget given to each model that
+                still has a fallback after it
+        """
+        env_models = [name.strip() for name in os.getenv("MISTRAL_MODELS", "").split(",") if name.strip()]
+        self.models = list(models or env_models or DEFAULT_MODELS)
+        self.budget = float(budget if budget is not None else os.getenv("QUICKSLIDE_LLM_BUDGET", DEFAULT_BUDGET_SECONDS))
+        self.attempt_share = attempt_share
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def route(self, detailed=True, target_slides=15, reference_chars=0, budget=None):
+        """
+        Choose the model for a request.
+
+        Args:
+            detailed (bool): Whether detailed content was requested
+            target_slides (int): Requested number of slides
+            reference_chars (int): Size of the reference material in the prompt
+            budget (float, optional): Overrides the router's budget for this request
+
+        Returns:
+            Route: The chosen model, its fallbacks and the reason
+        """
+        budget = self.budget if budget is None else budget
+        score = (2 if detailed else 0) + (target_slides > LONG_DECK_SLIDES) + (reference_chars > LARGE_REFERENCE_CHARS)
+        last = len(self.models) - 1
+        index = max(0, last - score)
+
+        reason = "features"
+        while index < last:
+            expected = self.expected_latency(self.models[index])
+            if expected is None or expected <= self.attempt_timeout(budget, has_fallback=True):
+                break
+            index += 1
+            reason = "budget"
+        return Route(self.models[index:], reason, budget)
+
+    def attempt_timeout(self, remaining, has_fallback):
+        """Seconds the next model may take, leaving the rest of the budget to its fallbacks"""
+        return remaining * self.attempt_share if has_fallback else remaining
+
+    def record(self, model, seconds):
+        """Remember how long a call to a model took; timed-out calls count with their timeout"""
+        with self._lock:
+            samples = self._latencies.get(model)
+            if samples is None:
+                samples = self._latencies[model] = deque(maxlen=HISTORY)
+            samples.append((time.monotonic(), seconds))
+
+    def expected_latency(self, model):
+        """90th percentile of the model's recent latencies, or None without enough samples"""
+        cutoff = time.monotonic() - HISTORY_SECONDS
+        with self._lock:
+            samples = sorted(seconds for recorded, seconds in self._latencies.get(model, ()) if recorded >= cutoff)
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+
+
+# Shared by all clients in the process so latency history survives across requests
+router = ModelRouter()
@@ -0,0 +1,319 @@
+#pipeline.py
+import base64
+import binascii
+import io
+import os
+from PIL import Image
+import metrics
+import profiling
+import document_extractor
+from document_extractor import Document
+from mistral_client import MistralClient
+from ppt_generator import PPTGenerator
+from prompt_builder import PromptBuilder
+
+# Ordered stages of a single generation, used for progress reporting
+STAGES = ["extract", "llm", "render", "save"]
+
+THEMES = ["modern_blue", "elegant_dark", "vibrant", "minimal"]
+
+# Slide counts accepted from the CLI and HTTP API; the app's slider stays within these
+MIN_SLIDES = 1
+MAX_SLIDES = 50
+
+STAGE_LABELS = {
+    "queued": "Waiting for a free worker...",
+    "extract": "Preparing your inputs...",
+    "llm": "Generating content with Mistral AI...",
+    "render": "Building slides...",
+    "save": "Saving presentation...",
+    "done": "Done",
+}
+
+
+class GenerationError(Exception):
+    """Raised when a generation stage fails with a user-facing message"""
+
+
+def generation_kwargs(spec, base_dir=None):
+    """
+    Turn a job description from the CLI or HTTP API into `run_generation` arguments.
+
+    The spec accepts prompt, speech_text, file_text, num_slides, detailed, theme,
+    content and profile, plus `files` and `image` (paths relative to base_dir),
+    `documents` (objects with a name and base64 `data`) and `image_data` (base64).
+
+    Args:
+        spec (dict): The job description
+        base_dir (str, optional): Directory that relative file paths are resolved against.
+            When None, as for requests from the network, local paths are rejected.
+
+    Returns:
+        dict: Keyword arguments for `run_generation`, without the store
+
+    Raises:
+        ValueError: If the spec is missing a prompt, names an unknown theme or has a
+            malformed field such as a document without base64 data
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("A job must be a JSON object")
+
+    prompt = str(spec.get("prompt", "")).strip()
+    content = spec.get("content")
+    if content is not None:
+        _check_content(content)
+    if not prompt and not content:
+        raise ValueError("A job needs a prompt or pre-made content")
+
+    theme = spec.get("theme", "modern_blue")
+    if theme not in THEMES:
+        raise ValueError(f"Unknown theme '{theme}'. Choose one of: {', '.join(THEMES)}")
+
+    if base_dir is None and (spec.get("files") or spec.get("image")):
+        raise ValueError("Local file paths are not accepted here; send documents and image_data instead")
+
+    files = spec.get("files", [])
+    if not isinstance(files, list) or not all(isinstance(path, str) for path in files):
+        raise ValueError("files must be a list of paths")
+    documents = [Document.from_path(os.path.join(base_dir, path)) for path in files]
+
+    entries = spec.get("documents", [])
+    if not isinstance(entries, list):
+        raise ValueError("documents must be a list of objects with a name and base64 data")
+    for index, document in enumerate(entries):
+        if not isinstance(document, dict) or not isinstance(document.get("name"), str) or not document["name"]:
+            raise ValueError(f"documents[{index}] must be an object with a name and base64 data")
+        documents.append(Document(document["name"], _decode_base64(document.get("data"), f"documents[{index}].data")))
+
+    image = None
+    if spec.get("image"):
+        with open(os.path.join(base_dir, spec["image"]), "rb") as f:
+            image = _check_image(f.read(), "image")
+    elif spec.get("image_data"):
+        image = _check_image(_decode_base64(spec["image_data"], "image_data"), "image_data")
+
+    num_slides = _slide_count(spec.get("num_slides", 15), "num_slides")
+    for field in ("detailed", "profile"):
+        if spec.get(field) is not None and not isinstance(spec[field], bool):
+            raise ValueError(f"{field} must be true or false")
+
+    return {
+        "prompt": prompt or content.get("title", ""),
+        "speech_text": str(spec.get("speech_text") or ""),
+        "file_text": str(spec.get("file_text") or ""),
+        "num_slides": num_slides,
+        "detailed": bool(spec.get("detailed", True)),
+        "theme": theme,
+        "documents": documents,
+        "content": content,
+        "image": image,
+        "profile": spec.get("profile"),
+    }
+
+
+def _slide_count(value, field):
+    # bool is an int too, but "num_slides": true is a mistake rather than one slide
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{field} must be a whole number")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{field} must be a whole number")
+    if not MIN_SLIDES <= value <= MAX_SLIDES:
+        raise ValueError(f"{field} must be between {MIN_SLIDES} and {MAX_SLIDES}")
+    return value
+
+
+def _check_content(content):
+    """Reject pre-made content that the generator cannot render"""
+    if not isinstance(content, dict):
+        raise ValueError("content must be a JSON object")
+    for field in ("title", "subtitle", "call_to_action"):
+        if content.get(field) is not None and not isinstance(content[field], str):
+            raise ValueError(f"content.{field} must be a string")
+    if "target_slides" in content:
+        _slide_count(content["target_slides"], "content.target_slides")
+    sections = content.get("sections")
+    if not isinstance(sections, list) or not sections:
+        raise ValueError("content.sections must be a non-empty list")
+    for index, section in enumerate(sections):
+        if not isinstance(section, dict) or not isinstance(section.get("title"), str):
+            raise ValueError(f"content.sections[{index}] must be an object with a string title")
+        points = section.get("content", [])
+        if not isinstance(points, list) or not all(isinstance(point, str) for point in points):
+            raise ValueError(f"content.sections[{index}].content must be a list of strings")
+
+
+def _check_image(data, field):
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except Exception:
+        raise ValueError(f"{field} is not a supported image")
+    return data
+
+
+def _decode_base64(data, field):
+    if not isinstance(data, str) or not data:
+        raise ValueError(f"{field} must be a base64 string")
+    try:
+        # Line-wrapped base64, as written by most encoders, is accepted
+        return base64.b64decode("".join(data.split()), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError(f"{field} is not valid base64")
+
+
+def build_prompt(prompt, speech_text="", file_text="", num_slides=15, detailed=True):
+    """
+    Combine all user inputs into the prompt sent to the model, within the token budget.
+
+    Args:
+        prompt (str): The main topic or description
+        speech_text (str): Transcribed voice input, if any
+        file_text (str): Text extracted from the reference document, if any
+        num_slides (int): Target number of slides
+        detailed (bool): Whether to generate detailed content
+
+    Returns:
+        dict: prompt (the full prompt), the kept speech_text and file_text, and the
+            estimated token breakdown; see `PromptBuilder.build`
+    """
+    return PromptBuilder().build(prompt, speech_text, file_text, num_slides, detailed)
+
+
+def prepare_generation(prompt, speech_text="", file_text="", num_slides=15,
+                       detailed=True, theme="modern_blue", image=None):
+    """
+    Do the model-independent preparation of a generation ahead of time.
+
+    Builds the full prompt, extracts the presentation instructions and system prompt,
+    and resizes the cover image into the media cache. Pass the result to
+    `run_generation(prepared=...)`; it is only used if the inputs still match.
+
+    Returns:
+        dict: full_prompt and the prepared model request
+    """
+    with metrics.span("prepare"):
+        full_prompt = build_prompt(prompt, speech_text, file_text, num_slides, detailed)["prompt"]
+        request = MistralClient().prepare_request(full_prompt, detailed)
+        PPTGenerator(theme=theme, image=image).preload()
+    return {"full_prompt": full_prompt, "request": request}
+
+
+def safe_file_name(prompt):
+    """Build a download file name from the first characters of the prompt"""
+    safe_name = ''.join(c if c.isalnum() else '_' for c in prompt[:20]).strip('_')
+    if not safe_name:
+        safe_name = "ai_presentation"
+    return f"presentation_{safe_name}.pptx"
+
+
+def extract_documents(documents):
+    """
+    Extract and join the text of several reference documents.
+
+    The documents are extracted concurrently and share the reference budget; see
+    `document_extractor.extract_documents`.
+
+    Args:
+        documents (list): Objects with `name` and `getvalue()`, e.g. `document_extractor.Document`
+
+    Returns:
+        str: The extracted text, one block per document
+
+    Raises:
+        GenerationError: If a document cannot be read
+    """
+    results = document_extractor.extract_documents(documents)
+    for result in results:
+        if result["status"] != "ok":
+            raise GenerationError(f"{result['name']}: {result['error']}")
+    return document_extractor.combine_documents(results)
+
+
+def _prepared_request(prepared, full_prompt):
+    # Use the speculative preparation only if it already finished for exactly this prompt;
+    # the speculator's pool is shared by all sessions, so waiting could queue behind others
+    if prepared is None:
+        return None
+    if not prepared.done():
+        prepared.cancel()
+        metrics.inc("speculation_total", outcome="pending")
+        return None
+    try:
+        result = prepared.result()
+    except Exception:
+        result = None
+    hit = result is not None and result["full_prompt"] == full_prompt
+    metrics.inc("speculation_total", outcome="hit" if hit else "miss")
+    return result["request"] if hit else None
+
+
+def run_generation(prompt, cache, speech_text="", file_text="", num_slides=15,
+                   detailed=True, theme="modern_blue", documents=None, content=None,
+                   image=None, profile=None, prepared=None, progress=None):
+    """
+    Run the full extract -> LLM -> render -> save pipeline for one presentation.
+
+    Args:
+        prompt (str): The main topic or description
+        cache (RenderCache): Render cache whose artifact store receives the .pptx file
+        speech_text (str): Transcribed voice input, if any
+        file_text (str): Text extracted from the reference document, if any
+        num_slides (int): Target number of slides
+        detailed (bool): Whether to generate detailed content
+        theme (str): Presentation theme name
+        documents (list, optional): Reference documents to extract and add to file_text
+        content (dict, optional): Pre-made deck content; skips the model call when given
+        image (str or bytes, optional): Cover/logo image for the title, section and closing slides
+        profile (bool, optional): Force profiling on or off for this request; by default
+            QUICKSLIDE_PROFILE and QUICKSLIDE_PROFILE_SAMPLE decide
+        prepared (Future, optional): Speculative `prepare_generation` for the same inputs;
+            ignored if it failed, was cancelled or no longer matches the prompt
+        progress (callable, optional): Called with the stage name as each stage starts
+
+    Returns:
+        dict: file_path, file_name, slide_count, target_slides, the generated content
+            and whether the deck was reused from the render cache
+
+    Raises:
+        GenerationError: If the model call fails or returns an error
+    """
+    profiler = profiling.profile_request(profile)
+
+    def report(stage):
+        profiler.stage(stage)
+        if progress:
+            progress(stage)
+
+    with metrics.request(theme=theme, num_slides=num_slides, detailed=detailed), profiler:
+        report("extract")
+        with metrics.span("extract"):
+            if documents:
+                extracted = extract_documents(documents)
+                file_text = f"{file_text}\n\n{extracted}" if file_text else extracted
+            built = build_prompt(prompt, speech_text, file_text, num_slides, detailed)
+            full_prompt = built["prompt"]
+
+        if content is None:
+            report("llm")
+            client = MistralClient()
+            request = _prepared_request(prepared, full_prompt)
+            content = client.generate_content(full_prompt, detailed, reference_chars=len(built["file_text"]), prepared=request)
+            if "error" in content:
+                raise GenerationError(content["error"])
+
+        # Identical content, theme and image render to the same deck, so serve repeats from the cache
+        rendered = cache.render(content, theme, image=image, progress=report)
+        file_path = rendered["path"]
+        slide_count = rendered["slide_count"]
+        reused = rendered["tier"] is not None
+
+        return {
+            "file_path": file_path,
+            "file_name": safe_file_name(prompt),
+            "slide_count": slide_count,
+            "target_slides": num_slides,
+            "content": content,
+            "reused": reused,
+        }
@@ -4,18 +4,48 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR, MSO_AUTO_SIZE
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+import hashlib
+import io
+import os
 import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+from artifact_store import ArtifactStore
+from media_cache import media_cache
+from section_cache import section_cache
+
+# Bump whenever a change alters the rendered output, so cached decks are not reused
+GENERATOR_VERSION = "2.1"
+
+# Where the cover image goes on the title slide, and the logo on section and closing slides
+COVER_BOX = (Inches(3.5), Inches(0.95), Inches(3), Inches(1.3))
+LOGO_BOX = (Inches(8.4), Inches(6.4), Inches(1.2), Inches(0.8))
 
 class PPTGenerator:
-    def __init__(self, theme="modern_blue"):
-        self.ppt = Presentation()
+    def __init__(self, theme="modern_blue", image=None, template=None):
+        # A template given as bytes is parsed from memory, e.g. the one kept by each batch worker
+        self.ppt = Presentation(io.BytesIO(template) if isinstance(template, bytes) else template)
         self.title_slide_layout = self.ppt.slide_layouts[0]
         self.title_content_layout = self.ppt.slide_layouts[1]
         self.section_layout = self.ppt.slide_layouts[2] if len(self.ppt.slide_layouts) > 2 else self.ppt.slide_layouts[1]
         self.theme = theme
         self.theme_colors = self._get_theme_colors(theme)
         self.MAX_BULLETS_PER_SLIDE = 7  # Maximum number of bullet points per slide
-        
+        self.image = image  # Cover or logo image (path or bytes) for title, section and closing slides
+        self.template_key = self._template_key(template)
+        
+    @staticmethod
+    def _template_key(template):
+        """Identify the template for cache keys without hashing files on every deck"""
+        if template is None:
+            return None
+        if isinstance(template, bytes):
+            return hashlib.sha256(template).hexdigest()
+        stat = os.stat(template)
+        return [os.path.abspath(template), stat.st_size, stat.st_mtime]
+
     def _get_theme_colors(self, theme_name):
         """Define color schemes for different themes"""
         themes = {
@@ -128,7 +158,21 @@ class PPTGenerator:
         
         return sentences
         
-    def add_title_slide(self, title, subtitle=None):
+    def preload(self):
+        """Resize the cover image for each box it is placed in, ahead of rendering"""
+        if self.image is not None:
+            for box in (COVER_BOX, LOGO_BOX):
+                media_cache.fit(self.image, box[2], box[3])
+        return self
+
+    def _add_image(self, slide, image, left, top, width, height):
+        """Place an image centered in a box, resized once per box size by the shared media cache"""
+        data, image_width, image_height = media_cache.fit(image, width, height)
+        left += (width - image_width) // 2
+        top += (height - image_height) // 2
+        return slide.shapes.add_picture(io.BytesIO(data), left, top, image_width, image_height)
+    
+    def add_title_slide(self, title, subtitle=None, image=None):
         """Add a visually enhanced title slide"""
         slide = self.ppt.slides.add_slide(self.title_slide_layout)
         
@@ -177,6 +221,10 @@ class PPTGenerator:
         p.font.size = Pt(12)
         p.font.color.rgb = self.theme_colors["secondary"]
         
+        # Add the cover image between the top band and the title
+        if image:
+            self._add_image(slide, image, *COVER_BOX)
+        
         return slide
     
     def add_section_slide(self, title, content, slide_number=1, total_slides=1):
@@ -246,7 +294,7 @@ class PPTGenerator:
             
         return slide
     
-    def add_section_header_slide(self, section_title):
+    def add_section_header_slide(self, section_title, image=None):
         """Add a divider slide to mark a new section"""
         slide = self.ppt.slides.add_slide(self.section_layout)
         
@@ -278,9 +326,13 @@ class PPTGenerator:
         p.font.bold = True
         p.font.color.rgb = RGBColor(255, 255, 255)  # White text
         
+        # Add the image as a logo in the bottom right corner
+        if image:
+            self._add_image(slide, image, *LOGO_BOX)
+        
         return slide
     
-    def add_closing_slide(self, title="Thank You", content=None):
+    def add_closing_slide(self, title="Thank You", content=None, image=None):
         """Add a visually distinct closing slide"""
         slide = self.ppt.slides.add_slide(self.title_content_layout)
         
@@ -335,6 +387,10 @@ class PPTGenerator:
             p.font.size = Pt(28)
             p.font.color.rgb = RGBColor(255, 255, 255)  # White text
         
+        # Add the image as a logo in the bottom right corner
+        if image:
+            self._add_image(slide, image, *LOGO_BOX)
+        
         return slide
     
     def _distribute_content(self, title, content, max_slides=None):
@@ -391,19 +447,18 @@ class PPTGenerator:
         
         return slides_content
     
-    def generate_from_content(self, content):
-        """Generate a complete PowerPoint from structured content with accurate slide counting"""
-        # Get target slide count
-        target_slides = int(content.get("target_slides", 15))
-        
-        # Add title slide
-        self.add_title_slide(content.get("title", "Presentation"), content.get("subtitle", ""))
-        
-        # Track current section to add section dividers
-        current_section = None
-        
+    def _allocate_section_slides(self, sections, target_slides):
+        """
+        Split the content slide budget across sections in proportion to their content.
+
+        Args:
+            sections (list): Section dicts with "title" and "content"
+            target_slides (int): Total number of slides requested for the deck
+
+        Returns:
+            list: Number of content slides allocated to each section
+        """
         # Identify major sections for section header slides
-        sections = content.get("sections", [])
         unique_major_sections = set()
         for section in sections:
             section_title = section.get("title", "Section")
@@ -460,55 +515,285 @@ class PPTGenerator:
                 if sum(section_weights) == 0:
                     break
         
-        # Create all slides
-        content_slide_index = 0
-        current_section = None
+        return section_slides
+    
+    def plan_slides(self, content):
+        """
+        Work out every slide of the deck without rendering anything.
+
+        Args:
+            content (dict): Structured content as returned by the model
+
+        Returns:
+            list: One dict per slide, in deck order, with "index" (1-based slide number),
+                "type" ("title", "section_header", "content" or "closing") and its text.
+                Content slides also carry "section_index", "slide_number" and "total_slides".
+        """
+        # Get target slide count
+        target_slides = int(content.get("target_slides", 15))
+        sections = content.get("sections", [])
         
-        for idx, section in enumerate(sections):
-            section_title = section.get("title", "Section")
-            section_content = section.get("content", [])
-            content_slide_index += 1
-            
-            # Check if this is a new major section
-            major_section = section_title.split(":")[0].strip()
-            if current_section is None or current_section != major_section:
-                current_section = major_section
-                self.add_section_header_slide(current_section)
+        with metrics.span("allocate_sections"):
+            section_slides = self._allocate_section_slides(sections, target_slides)
+        
+            # Add title slide
+            plan = [{
+                "type": "title",
+                "title": content.get("title", "Presentation"),
+                "subtitle": content.get("subtitle", ""),
+            }]
             
-            # Distribute content across exactly the number of slides allocated
-            distributed_content = self._distribute_content(
-                section_title, 
-                section_content,
-                max_slides=section_slides[idx]
-            )
+            # Plan all slides
+            current_section = None
             
-            # Create slides for this section
-            total_section_slides = len(distributed_content)
-            for slide_idx, (slide_title, slide_content) in enumerate(distributed_content):
-                self.add_section_slide(
-                    slide_title, 
-                    slide_content,
-                    slide_number=slide_idx+1, 
-                    total_slides=total_section_slides
+            for idx, section in enumerate(sections):
+                section_title = section.get("title", "Section")
+                section_content = section.get("content", [])
+                
+                # Check if this is a new major section
+                major_section = section_title.split(":")[0].strip()
+                if current_section is None or current_section != major_section:
+                    current_section = major_section
+                    plan.append({"type": "section_header", "title": current_section})
+                
+                # Distribute content across exactly the number of slides allocated
+                distributed_content = self._distribute_content(
+                    section_title, 
+                    section_content,
+                    max_slides=section_slides[idx]
                 )
+                
+                # Plan slides for this section
+                total_section_slides = len(distributed_content)
+                for slide_idx, (slide_title, slide_content) in enumerate(distributed_content):
+                    plan.append({
+                        "type": "content",
+                        "title": slide_title,
+                        "content": slide_content,
+                        "section_index": idx,
+                        "slide_number": slide_idx + 1,
+                        "total_slides": total_section_slides,
+                    })
+            
+            # Add a closing slide with call to action if present
+            call_to_action = content.get("call_to_action", "")
+            if call_to_action:
+                plan.append({"type": "closing", "title": "Thank You", "content": call_to_action})
+            else:
+                plan.append({"type": "closing", "title": "Thank You", "content": None})
         
-        # Add a closing slide with call to action if present
-        call_to_action = content.get("call_to_action", "")
-        if call_to_action:
-            self.add_closing_slide("Thank You", call_to_action)
-        else:
-            self.add_closing_slide()
+        for index, slide in enumerate(plan, start=1):
+            slide["index"] = index
+        return plan
+    
+    def render_plan(self, plan):
+        """
+        Render a slide plan from `plan_slides` into the presentation.
+
+        Returns:
+            tuple: (presentation, total number of slides)
+        """
+        slides_before = len(self.ppt.slides)
+        
+        with metrics.span("render_slides"):
+            position = 0
+            while position < len(plan):
+                slide = plan[position]
+                if slide["type"] == "content":
+                    # Render all slides of the section together so they can come from the section cache
+                    end = position
+                    while (end < len(plan) and plan[end]["type"] == "content"
+                           and plan[end]["section_index"] == slide["section_index"]):
+                        end += 1
+                    self._render_section(plan[position:end])
+                    position = end
+                    continue
+
+                if slide["type"] == "title":
+                    self.add_title_slide(slide["title"], slide["subtitle"], image=self.image)
+                elif slide["type"] == "section_header":
+                    self.add_section_header_slide(slide["title"], image=self.image)
+                else:
+                    self.add_closing_slide(slide["title"], slide["content"], image=self.image)
+                position += 1
         
         # Verify the total number of slides
         actual_slides = len(self.ppt.slides)
+        metrics.inc("slides_rendered_total", actual_slides - slides_before)
         
         return self.ppt, len(self.ppt.slides)
     
+    def _render_section(self, slides):
+        """
+        Render the content slides of one section, splicing them from the section cache when
+        the same section was rendered before with this theme and template.
+
+        Args:
+            slides (list): The section's content slides from `plan_slides`
+        """
+        # The split of bullets over slides already reflects the title, content and allocation
+        key = ArtifactStore.make_key(
+            "section", GENERATOR_VERSION, self.theme, self.template_key,
+            [[slide["title"], slide["content"], slide["total_slides"]] for slide in slides]
+        )
+        cached = section_cache.get(key)
+        if cached is not None:
+            for xml in cached:
+                section_cache.splice(self.ppt.slides.add_slide(self.title_content_layout), xml)
+            metrics.inc("slides_spliced_total", len(cached))
+            return
+
+        rendered = [
+            self.add_section_slide(
+                slide["title"],
+                slide["content"],
+                slide_number=slide["slide_number"],
+                total_slides=slide["total_slides"]
+            )
+            for slide in slides
+        ]
+        section_cache.put(key, rendered)
+
+    def generate_from_content(self, content):
+        """Generate a complete PowerPoint from structured content with accurate slide counting"""
+        return self.render_plan(self.plan_slides(content))
+    
+    @classmethod
+    def generate_batch(cls, jobs, max_workers=None, image=None, template=None):
+        """
+        Render many decks across a pool of worker processes.
+
+        Each worker loads the template once and reuses it for every deck it renders.
+        Results are yielded as soon as each deck is saved, in completion order, and a
+        failing job is reported without stopping the rest of the batch.
+
+        Args:
+            jobs (iterable): (content, theme, output path) tuples; consumed lazily. A malformed
+                job, or one whose worker process dies, gets a failed result of its own
+            max_workers (int, optional): Number of worker processes; defaults to the CPU count
+            image (str or bytes, optional): Cover/logo image for every deck
+            template (str or bytes, optional): .pptx template; defaults to python-pptx's own
+
+        Yields:
+            dict: index (position in `jobs`), output_path, ok, slide_count, error,
+                render_seconds, save_seconds, seconds and the worker's pid
+        """
+        if isinstance(template, str):
+            with open(template, "rb") as f:
+                template = f.read()
+        elif template is None:
+            buffer = io.BytesIO()
+            Presentation().save(buffer)
+            template = buffer.getvalue()
+
+        max_workers = max_workers or os.cpu_count() or 1
+        jobs = enumerate(jobs)
+        pending = {}
+
+        def new_pool():
+            return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker, initargs=(template,))
+
+        executor = new_pool()
+        try:
+            while True:
+                # Keep a couple of jobs queued per worker rather than submitting the whole iterable
+                for index, job in jobs:
+                    try:
+                        content, theme, output_path = job
+                    except (TypeError, ValueError) as e:
+                        yield _batch_result(index, None, error=f"Invalid job, expected (content, theme, output path): {e}")
+                        continue
+
+                    try:
+                        future = executor.submit(_render_batch_job, index, content, theme, output_path, image)
+                    except BrokenProcessPool:
+                        # A worker died and took the pool with it; jobs already in flight fail
+                        # with their own results, the rest go to a fresh pool
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = new_pool()
+                        try:
+                            future = executor.submit(_render_batch_job, index, content, theme, output_path, image)
+                        except BrokenProcessPool as e:
+                            yield _batch_result(index, output_path, error=f"{type(e).__name__}: {e}")
+                            continue
+                    pending[future] = (index, output_path)
+                    if len(pending) >= max_workers * 2:
+                        break
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, output_path = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        # The worker itself died, e.g. BrokenProcessPool
+                        yield _batch_result(index, output_path, error=f"{type(e).__name__}: {e}")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def save(self, filename="presentation.pptx"):
-        """Save the presentation to a file"""
+        """
+        Save the presentation to a file.
+
+        Decks served by the app, CLI and server are stored through `RenderCache` instead,
+        which writes them to the artifact store.
+
+        Args:
+            filename (str): Target path; ".pptx" is appended if missing
+
+        Returns:
+            str: Path of the saved file
+        """
         # Ensure the filename has the correct extension
         if not filename.endswith('.pptx'):
             filename += '.pptx'
             
-        self.ppt.save(filename)
-        return filename
\ No newline at end of file
+        with metrics.span("save"):
+            self.ppt.save(filename)
+        metrics.inc("bytes_written_total", os.path.getsize(filename))
+        return filename
+
+
+# Template bytes of the current batch worker process, set by `_init_batch_worker`
+_batch_template = None
+
+
+def _init_batch_worker(template):
+    global _batch_template
+    _batch_template = template
+    # Parse it once up front so the first job does not pay for imports and parser setup
+    Presentation(io.BytesIO(template))
+
+
+def _batch_result(index, output_path, slide_count=None, error=None, render_seconds=None,
+                  save_seconds=None, seconds=None):
+    return {
+        "index": index,
+        "output_path": output_path,
+        "ok": error is None,
+        "slide_count": slide_count,
+        "error": error,
+        "render_seconds": render_seconds,
+        "save_seconds": save_seconds,
+        "seconds": seconds,
+        "pid": os.getpid(),
+    }
+
+
+def _render_batch_job(index, content, theme, output_path, image):
+    start = time.perf_counter()
+    try:
+        generator = PPTGenerator(theme=theme, image=image, template=_batch_template)
+        _, slide_count = generator.generate_from_content(content)
+        rendered = time.perf_counter()
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        output_path = generator.save(output_path)
+    except Exception as e:
+        return _batch_result(index, output_path, error=f"{type(e).__name__}: {e}",
+                             seconds=time.perf_counter() - start)
+    end = time.perf_counter()
+    return _batch_result(index, output_path, slide_count, render_seconds=rendered - start,
+                         save_seconds=end - rendered, seconds=end - start)
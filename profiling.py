@@ -0,0 +1,210 @@
+#profiling.py
+import cProfile
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from dotenv import load_dotenv
+
+# Load settings from .env file
+load_dotenv()
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "quickslide_profiles")
+TOP_ALLOCATIONS = 15
+MAX_STACK_DEPTH = 64
+# Paths contributing less than this many seconds are left out of the collapsed stacks
+MIN_STACK_SECONDS = 1e-4
+
+# cProfile and tracemalloc are process-wide in practice, so only one request is profiled at a time
+_active = threading.Lock()
+
+
+class _NullProfile:
+    """Returned when a request is not profiled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def stage(self, name):
+        pass
+
+
+_NULL_PROFILE = _NullProfile()
+
+
+class ProfileSession:
+    def __init__(self, directory, request_id=None, max_sessions=50):
+        """
+        Profile one generation with cProfile and record allocations per stage with tracemalloc.
+
+        On exit it writes `<id>.pstats`, `<id>.collapsed.txt` (flame graph input) and
+        `<id>.alloc.txt` (top allocation sites per stage) to the directory, keeping only
+        the newest `max_sessions` sessions.
+        """
+        self.directory = directory
+        self.request_id = request_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.max_sessions = max_sessions
+        self.profiler = cProfile.Profile()
+        self._stages = []
+        self._current_stage = None
+        self._snapshot = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        self.stage("start")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stage(None)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        try:
+            self._write()
+        finally:
+            _active.release()
+        return False
+
+    def stage(self, name):
+        """Close the current stage, recording its top allocation sites, and start the next one"""
+        # Keep the snapshot work itself out of the CPU profile
+        self.profiler.disable()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._snapshot is not None:
+            top = snapshot.compare_to(self._snapshot, "lineno")[:TOP_ALLOCATIONS]
+            self._stages.append((self._current_stage, top))
+        self._snapshot = snapshot
+        self._current_stage = name
+        if name is not None:
+            self.profiler.enable()
+
+    def _write(self):
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = os.path.join(self.directory, self.request_id)
+
+        self.profiler.dump_stats(prefix + ".pstats")
+
+        stats = pstats.Stats(self.profiler).stats
+        with open(prefix + ".collapsed.txt", "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(collapse_stacks(stats).items()):
+                f.write(f"{stack} {int(seconds * 1_000_000)}\n")
+
+        with open(prefix + ".alloc.txt", "w", encoding="utf-8") as f:
+            for stage, top in self._stages:
+                f.write(f"== {stage} ==\n")
+                for diff in top:
+                    frame = diff.traceback[0]
+                    f.write(f"{diff.size_diff / 1024:+10.1f} KiB {diff.count_diff:+8d} blocks  "
+                            f"{frame.filename}:{frame.lineno}\n")
+                f.write("\n")
+
+        _prune(self.directory, self.max_sessions)
+
+
+def _label(func):
+    filename, lineno, name = func
+    return f"{os.path.basename(filename)}:{lineno}:{name}" if lineno else name
+
+
+def collapse_stacks(stats):
+    """
+    Approximate collapsed call stacks from cProfile's caller graph.
+
+    cProfile only records caller -> callee edges, so a function's time is split across
+    the paths that reach it in proportion to the time each calling edge accounts for.
+
+    Args:
+        stats (dict): `pstats.Stats(...).stats`
+
+    Returns:
+        dict: "root;caller;callee" -> self seconds
+    """
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+    roots = [func for func, entry in stats.items() if not any(caller in stats for caller in entry[4])]
+
+    stacks = defaultdict(float)
+
+    def walk(func, path, on_path, fraction):
+        self_time = stats[func][2]
+        if self_time * fraction > 0:
+            stacks[";".join(path)] += self_time * fraction
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for child, edge_time in callees[func].items():
+            if child in on_path or child not in stats:
+                continue
+            child_total = stats[child][3]
+            share = fraction * (edge_time / child_total if child_total else 0)
+            if share * child_total < MIN_STACK_SECONDS:
+                continue
+            on_path.add(child)
+            walk(child, path + [_label(child)], on_path, share)
+            on_path.discard(child)
+
+    for root in roots:
+        walk(root, [_label(root)], {root}, 1.0)
+    return stacks
+
+
+def _prune(directory, max_sessions):
+    # Keep the newest sessions; each session is the set of files sharing a request ID
+    sessions = defaultdict(float)
+    for name in os.listdir(directory):
+        session_id = name.split(".", 1)[0]
+        try:
+            sessions[session_id] = max(sessions[session_id], os.path.getmtime(os.path.join(directory, name)))
+        except OSError:
+            pass
+    expired = sorted(sessions, key=sessions.get)[:max(0, len(sessions) - max_sessions)]
+    for name in os.listdir(directory):
+        if name.split(".", 1)[0] in expired:
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def profile_request(enabled=None, request_id=None):
+    """
+    Start profiling a request if it is selected.
+
+    A request is profiled when `enabled` is True, or when `enabled` is None,
+    QUICKSLIDE_PROFILE=1 and the request falls within QUICKSLIDE_PROFILE_SAMPLE
+    (a fraction between 0 and 1, default 1). Requests arriving while another one
+    is being profiled are not profiled.
+
+    Args:
+        enabled (bool, optional): Per-request override of the environment setting
+        request_id (str, optional): Name of the output files
+
+    Returns:
+        A context manager with a `stage(name)` method
+    """
+    if enabled is None:
+        if os.getenv("QUICKSLIDE_PROFILE", "0") != "1":
+            return _NULL_PROFILE
+        enabled = random.random() < float(os.getenv("QUICKSLIDE_PROFILE_SAMPLE", "1"))
+    if not enabled or not _active.acquire(blocking=False):
+        return _NULL_PROFILE
+
+    return ProfileSession(
+        os.getenv("QUICKSLIDE_PROFILE_DIR") or DEFAULT_DIR,
+        request_id=request_id,
+        max_sessions=int(os.getenv("QUICKSLIDE_PROFILE_MAX_SESSIONS", "50")),
+    )
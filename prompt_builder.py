@@ -0,0 +1,207 @@
+#prompt_builder.py
+import os
+import re
+from functools import lru_cache
+from dotenv import load_dotenv
+import metrics
+
+# Load settings from .env file
+load_dotenv()
+
+DEFAULT_MAX_TOKENS = 32000
+# Room left for the slide instruction lines the client appends to the user message
+INSTRUCTION_RESERVE_TOKENS = 256
+TRUNCATION_MARKER = " [...]"
+
+# Words and single punctuation marks; long words count as several tokens
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Average characters per token for word pieces, close to Mistral's tokenizer on English text
+CHARS_PER_TOKEN = 4
+
+SYSTEM_PROMPT_TEMPLATE = """
+        You are an expert presentation content creator specializing in insightful and {detail_level} AI-driven presentations.
+
+        **Instructions:**
+        - Create a **well-structured** presentation based on the user's input.
+        - CRITICALLY IMPORTANT: Generate EXACTLY {target_slides} slides total, including title and closing slides.
+        - You MUST output content that will result in EXACTLY {target_slides} slides when processed.
+        - If specific slide instructions are provided (like 'leave slide 3 blank'), you MUST follow them exactly.
+        - Ensure the presentation has a **logical flow** with clear progression between topics.
+        - Include **real-world examples, case studies, and statistics** where relevant.
+        - Balance **technical depth** while keeping it engaging for a general audience.
+        - Use **rich text formatting** in your content points:
+            - Use **double asterisks** for important terms or concepts that should be bold
+            - Use *single asterisks* for terms that should be italic
+
+        **Format Requirements:**
+        Your response should be a **JSON object** with the following structure:
+
+        {{
+            "title": "Presentation Title",
+            "subtitle": "Optional Subtitle",
+            "target_slides": {target_slides},
+            "sections": [
+                {{
+                    "title": "Section Title",
+                    "content": ["Point 1 with **bold** and *italic* text", "Point 2", "Point 3"]
+                }}
+            ],
+            "call_to_action": "Key takeaways and next steps",
+            "special_instructions": []
+        }}
+
+        **Important Notes for Achieving {target_slides} Slides:**
+        - The presentation will ALWAYS include title and closing slides (2 slides total).
+        - Each major section (before the colon in section titles) gets a section header slide.
+        - Content slides have a maximum of 7 bullet points each.
+        - If a section has more bullet points, it will be split across multiple slides.
+        - To ensure you hit exactly {target_slides} slides:
+        1. Carefully plan your major sections (each adds 1 slide)
+        2. Adjust the number of content bullet points to achieve the right slide count
+        3. Include the exact "target_slides" value of {target_slides} in your JSON response
+        """
+
+# Asks for only the sections a cut-off answer is missing, instead of the whole deck again
+CONTINUATION_PROMPT = """
+        You are continuing a presentation outline whose previous answer was cut off.
+        Respond with a JSON object: {"sections": [{"title": "Section Title", "content": ["Point 1", "Point 2"]}], "call_to_action": "Key takeaways and next steps"}
+        Use **double asterisks** for bold and *single asterisks* for italic terms, as in the existing sections.
+        """
+# Tokens of the original request repeated in a continuation, enough to keep the topic
+CONTINUATION_TOPIC_TOKENS = 300
+
+
+def _token_cost(word):
+    return -(-len(word) // CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text):
+    """Approximate the number of model tokens in a text without calling the API"""
+    return sum(_token_cost(match) for match in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cut a text to at most `max_tokens` estimated tokens, marking the cut.
+
+    Returns:
+        str: The text, unchanged if it already fits
+    """
+    if max_tokens <= 0:
+        return ""
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    used = 0
+    end = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        used += _token_cost(match.group())
+        if used > budget:
+            return text[:end].rstrip() + TRUNCATION_MARKER if end else ""
+        end = match.end()
+    return text
+
+
+@lru_cache(maxsize=128)
+def system_prompt(detailed, target_slides):
+    """
+    The system prompt for a detail level and slide count, rendered once and reused.
+
+    Returns:
+        tuple: (system prompt, its estimated tokens)
+    """
+    detail_level = "highly detailed and comprehensive" if detailed else "concise and focused"
+    text = SYSTEM_PROMPT_TEMPLATE.format(detail_level=detail_level, target_slides=target_slides)
+    return text, estimate_tokens(text)
+
+
+class PromptBuilder:
+    def __init__(self, max_tokens=None):
+        """
+        Assemble the user message within a token budget.
+
+        The budget covers the system prompt and the user message. When the inputs do not
+        fit, the reference material is trimmed first, then the transcribed speech, and
+        the user's own prompt last.
+
+        Args:
+            max_tokens (int, optional): Defaults to QUICKSLIDE_PROMPT_MAX_TOKENS or 32000
+        """
+        self.max_tokens = int(max_tokens or os.getenv("QUICKSLIDE_PROMPT_MAX_TOKENS", DEFAULT_MAX_TOKENS))
+
+    def build(self, prompt, speech_text="", file_text="", num_slides=15, detailed=True):
+        """
+        Combine all user inputs into the prompt sent to the model.
+
+        Args:
+            prompt (str): The main topic or description
+            speech_text (str): Transcribed voice input, if any
+            file_text (str): Text extracted from the reference document, if any
+            num_slides (int): Target number of slides
+            detailed (bool): Whether detailed content is requested, which selects the system prompt
+
+        Returns:
+            dict: prompt (the full user message), the kept speech_text and file_text,
+                and tokens, the estimated tokens per part and how many were trimmed
+        """
+        slide_line = f"\n\nTarget exactly {num_slides} slides total."
+        _, system_tokens = system_prompt(detailed, num_slides)
+        available = self.max_tokens - system_tokens - estimate_tokens(slide_line) - INSTRUCTION_RESERVE_TOKENS
+
+        # Highest priority first; each part gets what is left after the ones before it
+        parts = {"prompt": prompt.strip(), "speech": speech_text, "reference": file_text}
+        tokens = {"system": system_tokens}
+        trimmed = {}
+        for name, text in parts.items():
+            if not text:
+                tokens[name] = 0
+                continue
+            cost = estimate_tokens(text)
+            if cost > available:
+                parts[name] = text = truncate_to_tokens(text, available)
+                trimmed[name] = cost - estimate_tokens(text)
+                cost = estimate_tokens(text)
+            available -= cost
+            tokens[name] = cost
+
+        full_prompt = parts["prompt"]
+        if parts["speech"]:
+            full_prompt = f"{full_prompt}\n\nAdditional spoken details: {parts['speech']}"
+        if parts["reference"]:
+            full_prompt = f"{full_prompt}\n\nReference material: {parts['reference']}"
+        full_prompt += slide_line
+
+        tokens["total"] = system_tokens + sum(tokens[name] for name in parts) + estimate_tokens(slide_line)
+        tokens["trimmed"] = trimmed
+        for name, count in trimmed.items():
+            metrics.inc("prompt_tokens_trimmed_total", count, part=name)
+        metrics.annotate(prompt_tokens=tokens)
+
+        return {
+            "prompt": full_prompt,
+            "speech_text": parts["speech"],
+            "file_text": parts["reference"],
+            "tokens": tokens,
+        }
+
+
+def continuation_prompt(deck, sections_needed, request):
+    """
+    Build a short request for the sections missing from a cut-off answer.
+
+    Args:
+        deck (dict): What was recovered, with at least "title" and "sections"
+        sections_needed (int): Number of new sections to ask for
+        request (str): The original user message; only its start is repeated
+
+    Returns:
+        tuple: (system prompt, user message)
+    """
+    titles = "\n".join(f"- {section['title']}" for section in deck["sections"]) or "- (none yet)"
+    message = (
+        f"Presentation: {deck['title']}\n"
+        f"Topic: {truncate_to_tokens(request, CONTINUATION_TOPIC_TOKENS)}\n\n"
+        f"Sections already written:\n{titles}\n\n"
+        f"Write exactly {sections_needed} more section{'s' if sections_needed != 1 else ''} "
+        f"that follow on from these without repeating them, "
+        f"then the call to action."
+    )
+    return CONTINUATION_PROMPT, message
@@ -0,0 +1,149 @@
+#render_cache.py
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+import metrics
+from artifact_store import ArtifactStore
+from ppt_generator import GENERATOR_VERSION, PPTGenerator
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024  # 64 MB
+
+
+def _image_digest(image):
+    if image is None:
+        return None
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            image = f.read()
+    return hashlib.sha256(image).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, store, memory_bytes=DEFAULT_MEMORY_BYTES):
+        """
+        Two-tier cache of rendered decks in front of `PPTGenerator.generate_from_content` and `save`.
+
+        Rendering is deterministic in the content, theme, image and generator version, so a
+        repeated request is served from memory, or from the artifact store on disk, without
+        touching python-pptx.
+
+        Args:
+            store (ArtifactStore): Disk tier; also where served decks live
+            memory_bytes (int): Size cap of the in-memory tier
+        """
+        self.store = store
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()  # key -> (bytes, slide count)
+        self._memory_total = 0
+        self._lock = threading.Lock()
+        self._metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0}
+
+    @staticmethod
+    def make_key(content, theme, image=None):
+        """Canonical hash of everything that affects the rendered deck"""
+        return ArtifactStore.make_key("render", GENERATOR_VERSION, content, theme, _image_digest(image))
+
+    def get(self, key):
+        """
+        Look up a rendered deck.
+
+        Returns:
+            dict or None: path, slide_count and the tier ("memory" or "disk") it came from
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is not None:
+            data, slide_count = entry
+            found = self.store.get(key)
+            # Put the deck back on disk if the store evicted it; callers need a file to serve
+            path = found["path"] if found else self.store.put(key, data, meta={"slide_count": slide_count})
+            self._count("memory_hits", tier="memory")
+            return {"path": path, "slide_count": slide_count, "tier": "memory"}
+
+        found = self.store.get(key)
+        if found is not None and found["meta"]:
+            slide_count = found["meta"]["slide_count"]
+            try:
+                with open(found["path"], "rb") as f:
+                    self._remember(key, f.read(), slide_count)
+            except OSError:
+                pass
+            self._count("disk_hits", tier="disk")
+            return {"path": found["path"], "slide_count": slide_count, "tier": "disk"}
+
+        self._count("misses")
+        return None
+
+    def put(self, key, data, slide_count):
+        """Store a rendered deck in both tiers and return its path"""
+        path = self.store.put(key, data, meta={"slide_count": slide_count})
+        self._remember(key, data, slide_count)
+        return path
+
+    def render(self, content, theme="modern_blue", image=None, progress=None):
+        """
+        Return a rendered deck, rendering it only if neither tier has it.
+
+        Args:
+            content (dict): Structured content as returned by the model
+            theme (str): Presentation theme name
+            image (str or bytes, optional): Cover/logo image
+            progress (callable, optional): Called with "render" and "save" when rendering
+
+        Returns:
+            dict: path, slide_count and tier ("memory", "disk" or None when freshly rendered)
+        """
+        key = self.make_key(content, theme, image)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        if progress:
+            progress("render")
+        ppt_gen = PPTGenerator(theme=theme, image=image)
+        _, slide_count = ppt_gen.generate_from_content(content)
+
+        if progress:
+            progress("save")
+        with metrics.span("save"):
+            buffer = io.BytesIO()
+            ppt_gen.ppt.save(buffer)
+            data = buffer.getvalue()
+            path = self.put(key, data, slide_count)
+        metrics.inc("bytes_written_total", len(data))
+        return {"path": path, "slide_count": slide_count, "tier": None}
+
+    def metrics(self):
+        """Return hit and eviction counters for both tiers"""
+        with self._lock:
+            result = dict(self._metrics)
+            result["memory_entries"] = len(self._memory)
+            result["memory_bytes"] = self._memory_total
+        result["disk"] = self.store.metrics()
+        return result
+
+    def _count(self, name, **labels):
+        with self._lock:
+            self._metrics[name] += 1
+        if name == "misses":
+            metrics.inc("render_cache_misses_total")
+        else:
+            metrics.inc("render_cache_hits_total", **labels)
+
+    def _remember(self, key, data, slide_count):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_total -= len(self._memory[key][0])
+            self._memory[key] = (data, slide_count)
+            self._memory.move_to_end(key)
+            self._memory_total += len(data)
+            while self._memory_total > self.memory_bytes:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_total -= len(evicted)
+                self._metrics["memory_evictions"] += 1
@@ -0,0 +1,183 @@
+#response_parser.py
+import json
+
+# A deck needs about one section per this many slides; fewer recovered sections call for a continuation
+SLIDES_PER_SECTION = 5
+MIN_SECTIONS = 2
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def _skip_whitespace(text, pos):
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def strip_code_fence(text):
+    """Drop a ```json fence around the response, which some models add despite JSON mode"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text
+
+
+def strip_trailing_commas(text):
+    """Remove commas directly before a closing bracket, leaving string contents alone"""
+    output = []
+    in_string = False
+    escaped = False
+    for pos, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            following = _skip_whitespace(text, pos + 1)
+            if following < len(text) and text[following] in "]}":
+                continue
+        output.append(char)
+    return "".join(output)
+
+
+def _salvage_array(text, pos):
+    """
+    Decode array elements one by one until the array closes or an element is cut off.
+
+    Returns:
+        tuple: (complete elements, position after the array, whether it was closed)
+    """
+    items = []
+    while True:
+        pos = _skip_whitespace(text, pos)
+        if pos >= len(text):
+            return items, pos, False
+        if text[pos] == ",":
+            pos += 1
+            continue
+        if text[pos] == "]":
+            return items, pos + 1, True
+        try:
+            item, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            return items, pos, False
+        items.append(item)
+
+
+def _salvage_object(text):
+    """
+    Decode the top-level object field by field, keeping every complete section.
+
+    Returns:
+        tuple: (recovered fields, whether the object was complete)
+    """
+    pos = text.find("{")
+    if pos < 0:
+        return None, False
+    data = {}
+    pos += 1
+    while True:
+        pos = _skip_whitespace(text, pos)
+        if pos >= len(text):
+            return data, False
+        if text[pos] == ",":
+            pos += 1
+            continue
+        if text[pos] == "}":
+            return data, True
+        try:
+            key, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            return data, False
+        pos = _skip_whitespace(text, pos)
+        if not isinstance(key, str) or not text.startswith(":", pos):
+            return data, False
+        pos = _skip_whitespace(text, pos + 1)
+
+        if key == "sections" and text.startswith("[", pos):
+            data["sections"], pos, closed = _salvage_array(text, pos + 1)
+            if not closed:
+                return data, False
+            continue
+        try:
+            data[key], pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            return data, False
+
+
+def parse_deck(text):
+    """
+    Parse the model's JSON answer, recovering what it can from a malformed or cut-off one.
+
+    Args:
+        text (str): Message content returned by the model
+
+    Returns:
+        tuple: (data or None, outcome), where outcome is "ok" for valid JSON, "repaired"
+            when stripping a code fence or trailing commas was enough, "truncated" when
+            only the complete fields and sections could be kept, or "failed"
+    """
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data, "ok"
+    except ValueError:
+        pass
+
+    cleaned = strip_trailing_commas(strip_code_fence(text))
+    try:
+        data = json.loads(cleaned)
+        if isinstance(data, dict):
+            return data, "repaired"
+    except ValueError:
+        pass
+
+    data, complete = _salvage_object(cleaned)
+    if not data:
+        return None, "failed"
+    return data, "repaired" if complete else "truncated"
+
+
+def normalize_deck(data, target_slides):
+    """
+    Fill in defaults for missing fields.
+
+    Sections are kept as the model sent them, including title-only ones such as dividers
+    or slides left blank on request; only entries that are not objects are dropped.
+
+    Returns:
+        dict: The deck with title, subtitle, target_slides, sections, call_to_action
+            and special_instructions always present
+    """
+    sections = []
+    for index, section in enumerate(data.get("sections") or [], start=1):
+        if not isinstance(section, dict):
+            continue
+        content = section.get("content") or []
+        if isinstance(content, str):
+            content = [content]
+        content = [str(point) for point in content if isinstance(point, (str, int, float))]
+        sections.append(dict(section, title=str(section.get("title") or f"Section {index}"), content=content))
+
+    deck = dict(data)
+    deck["title"] = str(data.get("title") or "Presentation")
+    deck["subtitle"] = str(data.get("subtitle") or "")
+    deck["target_slides"] = data.get("target_slides") or target_slides
+    deck["sections"] = sections
+    deck["call_to_action"] = str(data.get("call_to_action") or "")
+    deck["special_instructions"] = data.get("special_instructions") or []
+    return deck
+
+
+def missing_sections(deck, target_slides):
+    """Number of sections to request so the deck can fill `target_slides` sensibly"""
+    wanted = max(MIN_SECTIONS, target_slides // SLIDES_PER_SECTION)
+    return max(0, wanted - len(deck.get("sections", [])))
@@ -0,0 +1,97 @@
+#section_cache.py
+import os
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from lxml import etree
+from pptx.oxml import parse_xml
+import metrics
+
+# Load settings from .env file
+load_dotenv()
+
+DEFAULT_MAX_MB = 32
+
+
+class SectionCache:
+    def __init__(self, max_bytes=None):
+        """
+        Memory cache of rendered section slides, shared by every generator in the process.
+
+        A section's content slides depend only on its title, its bullets as distributed
+        over the slides allocated to it, the theme and the template. Their shape trees are
+        kept as XML and spliced into later decks, so a deck variant that only changes the
+        title or call to action renders just the slides around the shared sections.
+
+        Args:
+            max_bytes (int, optional): Size cap of the cached XML. Defaults to
+                QUICKSLIDE_SECTION_CACHE_MB (32) megabytes
+        """
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("QUICKSLIDE_SECTION_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> list of spTree XML, one per slide
+        self._total = 0
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """
+        Look up a rendered section.
+
+        Returns:
+            list or None: Shape tree XML of each of the section's slides, in order
+        """
+        with self._lock:
+            slides = self._entries.get(key)
+            if slides is not None:
+                self._entries.move_to_end(key)
+                self._metrics["hits"] += 1
+            else:
+                self._metrics["misses"] += 1
+        metrics.inc("section_cache_total", outcome="hit" if slides is not None else "miss")
+        return slides
+
+    def put(self, key, slides):
+        """Remember the shape trees of a section's freshly rendered slides"""
+        slides = [etree.tostring(slide._element.cSld.spTree) for slide in slides]
+        size = sum(len(xml) for xml in slides)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total -= sum(len(xml) for xml in self._entries[key])
+            self._entries[key] = slides
+            self._entries.move_to_end(key)
+            self._total += size
+            while self._total > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._total -= sum(len(xml) for xml in dropped)
+                self._metrics["evictions"] += 1
+
+    @staticmethod
+    def splice(slide, xml):
+        """Replace a new slide's shapes with those of a cached shape tree"""
+        # Swap the children, not the tree itself: `slide.shapes` keeps a reference to it
+        tree = slide._element.cSld.spTree
+        for child in list(tree):
+            tree.remove(child)
+        tree.extend(parse_xml(xml))
+        return slide
+
+    def metrics(self):
+        """Return hit, miss and eviction counters and the current size"""
+        with self._lock:
+            result = dict(self._metrics)
+            result["entries"] = len(self._entries)
+            result["bytes"] = self._total
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+
+# Shared by all generators in the process, like the media cache
+section_cache = SectionCache()
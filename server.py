@@ -0,0 +1,167 @@
+#server.py
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import metrics
+from artifact_store import ArtifactStore
+from render_cache import RenderCache
+from section_cache import section_cache
+from pipeline import GenerationError, generation_kwargs, run_generation
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+MAX_REQUEST_BYTES = 50 * 1024 * 1024  # 50 MB, enough for a few base64 reference documents
+CHUNK_SIZE = 64 * 1024
+
+
+class GenerationHandler(BaseHTTPRequestHandler):
+    """
+    POST /generate with a JSON job (see `pipeline.generation_kwargs`) returns the .pptx bytes.
+    GET /health returns a small status document.
+    GET /metrics returns stage timings and counters in the Prometheus text format.
+    """
+
+    # Set by `make_server`
+    cache = None
+    workers = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "render_cache": self.cache.metrics(),
+                                  "section_cache": section_cache.metrics()})
+        elif self.path == "/metrics":
+            body = metrics.registry.render_prometheus() + self._artifact_metrics()
+            self._send_body(200, "text/plain; version=0.0.4", body.encode("utf-8"))
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send_json(400, {"error": "Content-Length must be a number"})
+            return
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self._send_json(413 if length > 0 else 400, {"error": "Request body is missing or too large"})
+            return
+
+        try:
+            spec = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            self._send_json(400, {"error": f"Request body is not valid JSON: {e}"})
+            return
+        try:
+            kwargs = generation_kwargs(spec)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except (KeyError, TypeError):
+            self._send_json(400, {"error": "Invalid job description"})
+            return
+
+        # Generations beyond the worker count wait here for a free slot
+        with self.workers:
+            try:
+                result = run_generation(cache=self.cache, **kwargs)
+            except GenerationError as e:
+                self._send_json(502, {"error": str(e)})
+                return
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+
+        self._send_file(result)
+
+    def _send_file(self, result):
+        file_path = result["file_path"]
+        try:
+            f = open(file_path, "rb")
+            size = os.fstat(f.fileno()).st_size
+        except OSError:
+            # Evicted from the artifact store between rendering and sending
+            self._send_json(404, {"error": "The presentation is no longer available; please generate it again"})
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", PPTX_MIME)
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", f'attachment; filename="{result["file_name"]}"')
+            self.send_header("X-Slide-Count", str(result["slide_count"]))
+            self.end_headers()
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+
+    def _artifact_metrics(self):
+        cache_metrics = self.cache.metrics()
+        lines = ["# TYPE quickslide_artifact_store gauge"]
+        for name, value in sorted(cache_metrics.pop("disk").items()):
+            lines.append(f'quickslide_artifact_store{{metric="{name}"}} {value}')
+        lines.append("# TYPE quickslide_render_cache gauge")
+        for name, value in sorted(cache_metrics.items()):
+            lines.append(f'quickslide_render_cache{{metric="{name}"}} {value}')
+        lines.append("# TYPE quickslide_section_cache gauge")
+        for name, value in sorted(section_cache.metrics().items()):
+            lines.append(f'quickslide_section_cache{{metric="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def _send_json(self, status, payload):
+        self._send_body(status, "application/json", json.dumps(payload).encode("utf-8"))
+
+    def _send_body(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(host="127.0.0.1", port=8502, workers=4, cache=None):
+    """
+    Create the HTTP server without starting it.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind
+        workers (int): Number of generations that may run at the same time
+        cache (RenderCache, optional): Render cache for generated decks
+
+    Returns:
+        ThreadingHTTPServer: The server; call `serve_forever()` to start it
+    """
+    handler = type("BoundGenerationHandler", (GenerationHandler,), {
+        "cache": cache or RenderCache(ArtifactStore()),
+        "workers": threading.BoundedSemaphore(max(1, workers)),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve presentation generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8502, help="Port to bind (default: 8502)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("QUICKSLIDE_MAX_WORKERS", "4")),
+                        help="Number of generations that may run at the same time")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#speculation.py
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+
+class Speculator:
+    def __init__(self, max_workers=2, max_slots=200):
+        """
+        Run preparation work in the background as soon as its inputs are known.
+
+        Each slot (e.g. a browser session) holds at most one task. Submitting different
+        inputs to a slot cancels the previous task if it has not started, and invalidates
+        it either way, so only the latest inputs can ever be taken.
+
+        Args:
+            max_workers (int): Number of tasks that may run at the same time
+            max_slots (int): Number of slots remembered; the least recently used are dropped
+        """
+        self.max_slots = max_slots
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quickslide-prepare")
+        self._slots = OrderedDict()  # slot -> (key, future)
+        self._lock = threading.Lock()
+
+    def submit(self, slot, key, func, *args, **kwargs):
+        """
+        Start `func(*args, **kwargs)` for the slot unless the same key is already there.
+
+        Args:
+            slot (str): Owner of the task
+            key (str): Identifies the inputs the task was started for
+
+        Returns:
+            Future: The task for these inputs
+        """
+        with self._lock:
+            current = self._slots.get(slot)
+            if current is not None and current[0] == key:
+                self._slots.move_to_end(slot)
+                return current[1]
+
+            if current is not None:
+                current[1].cancel()
+                metrics.inc("speculation_cancelled_total")
+            future = self._executor.submit(func, *args, **kwargs)
+            self._slots[slot] = (key, future)
+            self._slots.move_to_end(slot)
+            while len(self._slots) > self.max_slots:
+                _, (_, dropped) = self._slots.popitem(last=False)
+                dropped.cancel()
+        metrics.inc("speculation_started_total")
+        return future
+
+    def take(self, slot, key):
+        """Return the slot's task if it was started for this key, otherwise None"""
+        with self._lock:
+            current = self._slots.get(slot)
+        if current is None or current[0] != key:
+            return None
+        return current[1]
+
+    def invalidate(self, slot):
+        """Cancel and forget the slot's task, e.g. when an input is cleared"""
+        with self._lock:
+            current = self._slots.pop(slot, None)
+        if current is not None:
+            current[1].cancel()
+            metrics.inc("speculation_cancelled_total")
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,272 @@
+#thumbnails.py
+import hashlib
+import io
+import json
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+import metrics
+from media_cache import EMU_PER_INCH, media_cache
+from ppt_generator import COVER_BOX, LOGO_BOX, PPTGenerator
+
+# Bump whenever the drawing changes, so cached thumbnails are not reused
+THUMBNAIL_VERSION = "1"
+# The default python-pptx template is 10 x 7.5 inches
+SLIDE_WIDTH_INCHES = 10
+SLIDE_HEIGHT_INCHES = 7.5
+WHITE = (255, 255, 255)
+
+
+def _plain(text):
+    # Same markers PPTGenerator strips before writing text to a slide
+    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
+    text = re.sub(r'\*(.*?)\*', r'\1', text)
+    text = re.sub(r'__(.*?)__', r'\1', text)
+    return re.sub(r'~~(.*?)~~', r'\1', text)
+
+
+@lru_cache(maxsize=64)
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only has a fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+# FreeType's cost is per glyph drawn, so each glyph is rasterized once and pasted from here,
+# which is several times faster for whole slides. Bounded, as text in any script can show up
+@lru_cache(maxsize=4096)
+def _glyph(size, char):
+    """Mask, offset and advance of one character; colour is applied when pasting"""
+    font = _font(size)
+    left, top, right, bottom = font.getbbox(char)
+    mask = None
+    if right > left and bottom > top:
+        mask = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), char, font=font, fill=255)
+    return mask, (left, top), font.getlength(char)
+
+
+class _Canvas:
+    """Draws on a thumbnail using slide coordinates in inches and font sizes in points"""
+
+    def __init__(self, width, background):
+        self.scale = width / SLIDE_WIDTH_INCHES
+        self.image = Image.new("RGB", (width, round(SLIDE_HEIGHT_INCHES * self.scale)), background)
+        self.draw = ImageDraw.Draw(self.image)
+
+    def px(self, inches):
+        return round(inches * self.scale)
+
+    def font_size(self, points):
+        return max(6, round(points / 72 * self.scale))
+
+    def length(self, text, size):
+        return sum(_glyph(size, char)[2] for char in text)
+
+    def write(self, position, text, size, color):
+        x, y = position
+        for char in text:
+            mask, (left, top), advance = _glyph(size, char)
+            if mask is not None:
+                self.draw.bitmap((round(x) + left, y + top), mask, fill=color)
+            x += advance
+
+    def rect(self, left, top, width, height, color):
+        self.draw.rectangle(
+            [self.px(left), self.px(top), self.px(left + width) - 1, self.px(top + height) - 1], fill=color
+        )
+
+    def _wrap(self, text, size, width):
+        lines = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for word in paragraph.split():
+                candidate = f"{line} {word}".strip()
+                if line and self.length(candidate, size) > width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return lines
+
+    def text(self, text, box, points, color, align="center", valign="middle", bold=False, min_points=10):
+        """Wrap text into a box, shrinking the font until it fits like TEXT_TO_FIT_SHAPE"""
+        left, top, width, height = (self.px(value) for value in box)
+        while True:
+            size = self.font_size(points)
+            lines = self._wrap(text, size, width)
+            line_height = round(size * 1.2)
+            if len(lines) * line_height <= height or points <= min_points:
+                break
+            points *= 0.85
+
+        # Keep whatever fits once the font cannot shrink any further
+        lines = lines[:max(1, height // line_height)]
+        y = top
+        if valign == "middle":
+            y += max(0, (height - len(lines) * line_height) // 2)
+        for line in lines:
+            line_width = self.length(line, size)
+            if align == "center":
+                x = left + (width - line_width) / 2
+            elif align == "right":
+                x = left + width - line_width
+            else:
+                x = left
+            # Overdraw one pixel to the right for a cheap bold
+            for offset in ((0, 1) if bold else (0,)):
+                self.write((x + offset, y), line, size, color)
+            y += line_height
+
+    def bullets(self, points, box, size, color, bullet_color):
+        left, top, width, height = box
+        size = self.font_size(size)
+        indent = self.px(0.35)
+        line_height = round(size * 1.25)
+        y = self.px(top)
+        bottom = self.px(top + height)
+        for point in points:
+            lines = self._wrap(_plain(point), size, self.px(width) - indent)
+            if y + line_height > bottom:
+                break
+            radius = max(1, size // 6)
+            center_x, center_y = self.px(left) + radius, y + size // 2
+            self.draw.ellipse([center_x - radius, center_y - radius, center_x + radius, center_y + radius],
+                              fill=bullet_color)
+            for line in lines:
+                if y + line_height > bottom:
+                    break
+                self.write((self.px(left) + indent, y), line, size, color)
+                y += line_height
+            y += line_height // 4
+
+    def picture(self, image, box):
+        # The media cache already holds the image resized for this box on the real slide
+        left, top, width, height = box
+        data, image_width, image_height = media_cache.fit(image, width, height)
+        with Image.open(io.BytesIO(data)) as picture:
+            size = (max(1, self.px(image_width / EMU_PER_INCH)), max(1, self.px(image_height / EMU_PER_INCH)))
+            picture = picture.convert("RGBA").resize(size, Image.LANCZOS)
+        x = self.px((left + (width - image_width) // 2) / EMU_PER_INCH)
+        y = self.px((top + (height - image_height) // 2) / EMU_PER_INCH)
+        self.image.paste(picture, (x, y), picture)
+
+    def png(self):
+        output = io.BytesIO()
+        self.image.save(output, format="PNG", optimize=False)
+        return output.getvalue()
+
+
+class ThumbnailRenderer:
+    def __init__(self, width=320, max_entries=1024):
+        """
+        Draw slide thumbnails with Pillow from a slide plan, without Office or LibreOffice.
+
+        The drawing follows the shapes PPTGenerator places for each slide type, using the
+        theme colors. Each thumbnail is cached by a hash of the slide's content, theme,
+        image and size, so after an edit only the slides that changed are drawn again.
+
+        Args:
+            width (int): Thumbnail width in pixels; the height follows the 4:3 slide
+            max_entries (int): Number of thumbnails kept, least recently used dropped first
+        """
+        self.width = width
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render_content(self, content, theme="modern_blue", image=None):
+        """
+        Thumbnails for every slide of a deck.
+
+        Args:
+            content (dict): Structured content as returned by the model
+            theme (str): Presentation theme name
+            image (str or bytes, optional): Cover/logo image, as passed to PPTGenerator
+
+        Returns:
+            list: PNG bytes, one per slide in deck order
+        """
+        generator = PPTGenerator(theme=theme, image=image)
+        return self.render_plan(generator.plan_slides(content), theme, image)
+
+    def render_plan(self, plan, theme="modern_blue", image=None):
+        """Thumbnails for a slide plan from `PPTGenerator.plan_slides`"""
+        with metrics.span("thumbnails"):
+            colors = PPTGenerator(theme=theme).theme_colors
+            image_digest = None
+            if isinstance(image, bytes):
+                image_digest = hashlib.sha256(image).hexdigest()
+            elif image is not None:
+                with open(image, "rb") as f:
+                    image_digest = hashlib.sha256(f.read()).hexdigest()
+            return [self.render_slide(slide, theme, colors, image, image_digest) for slide in plan]
+
+    def render_slide(self, slide, theme, colors, image=None, image_digest=None):
+        # The slide's position is not drawn, so moving a slide keeps its thumbnail
+        fields = {name: value for name, value in slide.items() if name != "index"}
+        key = hashlib.sha256(json.dumps(
+            [THUMBNAIL_VERSION, self.width, theme, image_digest, fields], sort_keys=True
+        ).encode("utf-8")).hexdigest()
+
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return png
+
+        png = self._draw(slide, colors, image)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = png
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        metrics.inc("thumbnails_rendered_total")
+        return png
+
+    def _draw(self, slide, colors, image):
+        kind = slide["type"]
+        if kind == "title":
+            canvas = _Canvas(self.width, WHITE)
+            canvas.rect(0, 0, 10, 0.85, colors["primary"])
+            canvas.text(_plain(slide["title"]), (0.75, 2.33, 8.5, 1.6), 44, colors["text"], bold=True)
+            if slide["subtitle"]:
+                canvas.text(_plain(slide["subtitle"]), (1.5, 4.25, 7, 1.9), 24, colors["secondary"], valign="top")
+            canvas.text("Created with AI Presentation Generator", (0.5, 6.5, 9, 0.5), 12,
+                        colors["secondary"], align="right")
+            if image is not None:
+                canvas.picture(image, COVER_BOX)
+
+        elif kind == "section_header":
+            canvas = _Canvas(self.width, colors["primary"])
+            canvas.text(_plain(slide["title"]), (1, 2.5, 8, 2), 54, WHITE, bold=True)
+            if image is not None:
+                canvas.picture(image, LOGO_BOX)
+
+        elif kind == "content":
+            canvas = _Canvas(self.width, WHITE)
+            canvas.rect(0, 0, 10, 0.2, colors["accent"])
+            canvas.text(_plain(slide["title"]), (0.5, 0.3, 9, 1.25), 36, colors["primary"], bold=True)
+            canvas.bullets(slide["content"], (0.5, 1.75, 9, 4.95), 24, colors["text"], colors["accent"])
+            if slide["total_slides"] > 1:
+                canvas.text(f"{slide['slide_number']}/{slide['total_slides']}", (9, 6.5, 0.5, 0.3), 10,
+                            colors["secondary"], align="right")
+
+        else:
+            canvas = _Canvas(self.width, colors["secondary"])
+            canvas.rect(0, 3.75, 10, 3.75, colors["primary"])
+            canvas.text(_plain(slide["title"]), (1, 2.5, 8, 1.5), 60, WHITE, bold=True)
+            if slide["content"]:
+                canvas.text(_plain(slide["content"]), (1, 4, 8, 1), 28, WHITE)
+            if image is not None:
+                canvas.picture(image, LOGO_BOX)
+
+        return canvas.png()